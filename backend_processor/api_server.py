@@ -17,35 +17,146 @@ Version: 3.0.0
 Author: Bob Vasic (CyberLink Security)
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from starlette.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
+from typing import List, Optional, Set, Tuple, Union
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import gzip
+import hashlib
+import struct
+import time
 import uuid
+import os
 import shutil
 from pathlib import Path
 from datetime import datetime
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+
+# orjson is optional - without it responses use stdlib json
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 
 # Import intelligent vectorizer
 from intelligent_vectorizer import vectorize_image
+from jit_kernels import warm_up
+import cv2
+from job_store import InMemoryJobStore, VectorizationStatus, create_job_store
 
 # Configure logging for production monitoring
-# Logs include timestamps, severity levels, and job tracking information
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s - %(message)s',
+# Logs include timestamps, severity levels, and job tracking information.
+# Handlers only enqueue records; a QueueListener thread does the stderr
+# writes, so a slow terminal or pipe never blocks the event loop. The
+# listener is started by lifespan (records logged before then wait in the
+# queue), so importing this module starts no threads
+LOG_FORMATTER = logging.Formatter(
+    '[%(asctime)s] %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
+log_stream = logging.StreamHandler()
+log_stream.setFormatter(LOG_FORMATTER)
+log_queue = queue.SimpleQueue()
+log_enqueue = QueueHandler(log_queue)
+log_enqueue.setFormatter(logging.Formatter('%(message)s'))  # Listener adds the prefix
+logging.basicConfig(level=logging.INFO, handlers=[log_enqueue])
+log_listener = QueueListener(log_queue, log_stream)
 logger = logging.getLogger(__name__)
 
+# Worker processes for CPU-bound vectorization
+# Jobs run outside the API process, so N cores vectorize N images in parallel
+# and request handling never waits behind the GIL
+def init_worker() -> None:
+    """
+    Pool worker initializer.
+    
+    Forked workers inherit the QueueHandler, but their copy of the queue
+    is process-local (the API's listener never drains it), so they log
+    straight to stderr instead. OpenCV's internal thread pool
+    is capped at WORKER_THREADS so concurrent jobs share the cores instead
+    of each starting one thread per core; the vectorizers size their own
+    stage thread pools from cv2.getNumThreads(), so they follow it. Then
+    the numba kernels are JIT-compiled once (warm_up) so the first job
+    does not pay for it.
+    """
+    logging.basicConfig(level=logging.INFO, handlers=[log_stream], force=True)
+    cv2.setNumThreads(WORKER_THREADS)
+    warm_up()
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", os.cpu_count() or 1))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))  # uvicorn worker processes (python3 api_server.py)
+# OpenCV threads per vectorization process (default: cores split across the pool)
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_JOBS)))
+def create_pool() -> ProcessPoolExecutor:
+    """A vectorization process pool (workers are forked on first use)"""
+    return ProcessPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, initializer=init_worker)
+
+async def run_in_pool(fn, *args):
+    """
+    Run fn(*args) in the app's process pool, recovering from a dead worker.
+    
+    A worker killed mid-job (OOM killer, segfault in native code) leaves
+    the ProcessPoolExecutor permanently broken: every later submit raises
+    BrokenProcessPool. The broken pool is replaced on app.state by a fresh
+    one and the call is retried once; if it breaks the new pool too, the
+    BrokenProcessPool propagates and only this job fails. app.state.pool_lock
+    makes concurrent jobs that saw the same broken pool replace it once.
+    """
+    loop = asyncio.get_running_loop()
+    pool = app.state.vectorize_pool
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        async with app.state.pool_lock:
+            if app.state.vectorize_pool is pool:  # Not already replaced by another job
+                logger.warning("[POOL] Worker died - restarting the process pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                app.state.vectorize_pool = create_pool()
+        return await loop.run_in_executor(app.state.vectorize_pool, fn, *args)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the worker pool and the log listener at boot, and stop them
+    together with the job store connection when the API stops.
+    
+    The pool lives on app.state rather than being built at import, so
+    importing this module (uvicorn workers, tests, spawn start method)
+    starts no processes. Workers are spawned lazily on first use;
+    submitting one no-op per slot at startup spawns (and warms up) all of
+    them before the first upload arrives. The workers are forked before
+    the log listener thread starts.
+    """
+    app.state.vectorize_pool = create_pool()
+    app.state.pool_lock = asyncio.Lock()
+    for _ in range(MAX_CONCURRENT_JOBS):
+        app.state.vectorize_pool.submit(int)
+    log_listener.start()
+    yield
+    app.state.vectorize_pool.shutdown(wait=False, cancel_futures=True)
+    await job_store.close()
+    log_listener.stop()  # Flushes queued records
+
 # Initialize FastAPI application with metadata
 # Automatically generates OpenAPI/Swagger documentation at /docs
 app = FastAPI(
     title="Vectorizer.dev API v3.0",
     description="Enterprise-grade vectorization: LAB color science + AI-enhanced edges + Bezier smoothing",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=DefaultResponse,  # orjson: fast status polling
+    lifespan=lifespan
 )
 
 # CORS (Cross-Origin Resource Sharing) configuration
@@ -68,118 +179,349 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 # File validation constraints
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB - prevent DoS attacks
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png"}  # Whitelist for security
+ALLOWED_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})  # Whitelist for security
+VALID_QUALITIES = frozenset({"fast", "balanced", "high", "ultra"})
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB per read/write when saving uploads
+# Starlette keeps uploads up to this size in memory, larger ones spill to disk
+UPLOAD_SPOOL_SIZE = MultiPartParser.spool_max_size
+
+# Magic bytes for accepted formats (checked against the upload header)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+IMAGE_SIGNATURES = (JPEG_SIGNATURE, PNG_SIGNATURE)
+HEADER_PEEK_SIZE = 64 * 1024  # Enough to reach the JPEG SOF past typical EXIF data
+MAX_IMAGE_PIXELS = 50_000_000  # Width x height limit (a 10MB PNG can decode to GBs)
+
+# JPEG start-of-frame markers (carry the image size); C4/C8/CC are not frames
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Job tracking store
+# Redis when REDIS_URL is set (shared across workers, survives restarts),
+# otherwise a process-local dict - see job_store.py
+job_store = create_job_store()
 
-# Pydantic data models for API request/response validation
-class VectorizationStatus(BaseModel):
+# Strong references to in-flight job coroutines (the event loop only keeps
+# weak ones, so an unreferenced task could be garbage collected mid-run)
+running_jobs: Set[asyncio.Task] = set()
+
+# Admission control: at most MAX_CONCURRENT_JOBS jobs hold a slot at once.
+# The rest wait here with status "queued", so a burst of uploads cannot pile
+# decoded images into memory, and /health can report the backlog
+job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+waiting_jobs: Set[str] = set()
+
+async def run_job(job_id: str, image: Union[str, bytes], quality: str, digest: str) -> None:
+    """Wait for a free job slot, then run process_vectorization"""
+    waiting_jobs.add(job_id)
+    try:
+        async with job_slots:
+            waiting_jobs.discard(job_id)
+            await process_vectorization(job_id, image, quality, digest)
+    finally:
+        waiting_jobs.discard(job_id)
+
+def submit_job(job_id: str, image: Union[str, bytes], quality: str, digest: str) -> None:
     """
-    Job status tracking model.
+    Schedule a job as its own task and return immediately.
     
-    Attributes:
-        job_id: Unique UUID identifier for the job
-        status: Current state (queued, processing, completed, failed)
-        progress: Completion percentage (0-100)
-        message: Human-readable status message
-        output_file: Absolute path to generated SVG (when completed)
-        processing_time: Total processing duration in seconds
-    """
-    job_id: str
-    status: str  # queued | processing | completed | failed
-    progress: int  # 0-100
-    message: Optional[str] = None
-    output_file: Optional[str] = None
-    processing_time: Optional[float] = None
-
-# In-memory job tracking dictionary
-# NOTE: In production, migrate to Redis for persistence and horizontal scaling
-# Key: job_id (UUID string), Value: VectorizationStatus object
-job_status: Dict[str, VectorizationStatus] = {}
-
-def validate_image(file: UploadFile) -> None:
+    Every job is a separate task, so a batch keeps up to MAX_CONCURRENT_JOBS
+    pool workers busy at once (BackgroundTasks would await them one by one).
+    """
+    task = asyncio.create_task(run_job(job_id, image, quality, digest))
+    running_jobs.add(task)
+    task.add_done_callback(running_jobs.discard)
+
+def _file_too_large() -> HTTPException:
+    """413 response shared by the upfront and mid-stream size checks"""
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024 * 1024)}MB"
+    )
+
+def _image_dimensions(header: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) read from a PNG IHDR or JPEG SOF header, without decoding.
+    
+    Returns None if the size is not within the header bytes given.
+    """
+    if header.startswith(PNG_SIGNATURE):
+        # IHDR is always the first chunk: length(4) type(4) width(4) height(4)
+        if len(header) >= 24 and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        return None
+    
+    # JPEG: walk marker segments until a start-of-frame
+    i = 2
+    while i + 9 <= len(header):
+        if header[i] != 0xFF:
+            return None
+        marker = header[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", header[i + 5:i + 9])
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Standalone markers
+            i += 2
+            continue
+        i += 2 + struct.unpack(">H", header[i + 2:i + 4])[0]
+    return None
+
+async def validate_image(file: UploadFile) -> str:
     """
     Validate uploaded image file against security constraints.
     
     Args:
         file: FastAPI UploadFile object containing the uploaded file
         
+    Returns:
+        Lowercase file extension (e.g. ".png"), reused for the saved file name
+        
     Raises:
-        HTTPException: 400 error if file extension not in whitelist
+        HTTPException: 400 error if file extension not in whitelist or the
+            content is not a JPEG/PNG image
+        HTTPException: 413 error if file exceeds MAX_FILE_SIZE, or its
+            header declares more than MAX_IMAGE_PIXELS
         
     Security:
         Prevents execution of malicious files by enforcing strict extension whitelist.
         File extension is normalized to lowercase for case-insensitive matching.
+        The file header is sniffed as well, so a renamed executable is rejected
+        before anything is written to disk or handed to an image decoder.
+        Image dimensions are read from the same header, so decompression
+        bombs (tiny file, huge canvas) never reach the vectorizer.
     """
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+            detail=f"Invalid file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
         )
+    
+    # Starlette records the size while spooling the upload
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise _file_too_large()
+    
+    # Magic-byte sniff: only the first bytes are read
+    header = await file.read(HEADER_PEEK_SIZE)
+    await file.seek(0)
+    if not header.startswith(IMAGE_SIGNATURES):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file content. Only JPEG and PNG images are accepted"
+        )
+    
+    dimensions = _image_dimensions(header)
+    if dimensions is not None and dimensions[0] * dimensions[1] > MAX_IMAGE_PIXELS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image too large: {dimensions[0]}x{dimensions[1]}. "
+                   f"Maximum: {MAX_IMAGE_PIXELS // 1_000_000} megapixels"
+        )
+    
+    return file_ext
+
+def _buffered_copy(src, dst: Path) -> str:
+    """Copy an upload through 1MB userspace buffers, enforcing MAX_FILE_SIZE"""
+    hasher = hashlib.sha256()
+    written = 0
+    with open(dst, "wb") as buffer:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > MAX_FILE_SIZE:
+                raise _file_too_large()
+            hasher.update(chunk)
+            buffer.write(chunk)
+    return hasher.hexdigest()
+
+async def save_upload(file: UploadFile, dst: Path) -> str:
+    """
+    Stream an uploaded file to disk without blocking the event loop.
+    
+    The copy runs on the threadpool in 1MB chunks, each hashed as it is
+    written (a single pass over the data).
+    
+    Args:
+        file: FastAPI UploadFile object containing the uploaded file
+        dst: Destination path for the saved file
+        
+    Returns:
+        SHA-256 hex digest of the content (computed while copying), used
+        to reuse results for identical uploads
+        
+    Raises:
+        HTTPException: 413 error if the stream exceeds MAX_FILE_SIZE
+            (UploadFile.size is not always known up front); the partial
+            file is removed
+    """
+    await file.seek(0)
+    
+    try:
+        return await run_in_threadpool(_buffered_copy, file.file, dst)
+    except HTTPException:
+        dst.unlink(missing_ok=True)
+        raise
+
+def _upload_in_memory(file: UploadFile) -> bool:
+    """
+    True if Starlette still holds the upload in memory.
+    
+    Decided from the public UploadFile.size (counted while spooling)
+    against the multipart parser's spool size: the SpooledTemporaryFile
+    only rolls over to disk once it grows past that. An unknown size
+    counts as on disk, so the upload is streamed by save_upload() rather
+    than read whole.
+    """
+    return file.size is not None and file.size <= UPLOAD_SPOOL_SIZE
+
+async def stage_upload(file: UploadFile, dst: Path) -> Tuple[Union[str, bytes], str]:
+    """
+    Make an upload available to the worker pool.
+    
+    Uploads Starlette still holds in memory (up to UPLOAD_SPOOL_SIZE)
+    are passed to the worker as bytes and decoded there, skipping a disk
+    write and re-read. Larger uploads are written to dst by save_upload().
+    
+    Returns:
+        (image source for run_vectorizer: bytes or path string, SHA-256 hex digest)
+    """
+    if _upload_in_memory(file):
+        await file.seek(0)
+        data = await file.read()
+        if len(data) > MAX_FILE_SIZE:
+            raise _file_too_large()
+        return data, hashlib.sha256(data).hexdigest()
+    
+    return str(dst), await save_upload(file, dst)
+
+def _link_cached_output(cached_svg: str, output_svg: str) -> bool:
+    """
+    Hardlink a previous job's SVG (and its .gz copy) to a new job's path.
+    
+    Returns False if the cached output no longer exists on disk.
+    """
+    try:
+        os.link(cached_svg, output_svg)
+    except FileNotFoundError:
+        return False
+    
+    try:
+        os.link(f"{cached_svg}.gz", f"{output_svg}.gz")
+    except FileNotFoundError:
+        pass  # Downloads fall back to the plain SVG
+    return True
+
+def run_vectorizer(image: Union[str, bytes], output_svg: str, quality: str) -> None:
+    """
+    Worker-process entry point for one vectorization job.
+    
+    image is the upload path, or the encoded bytes for small uploads.
+    Runs in the process pool; returns nothing, the SVG is already on disk.
+    Also writes {output_svg}.gz so downloads can be served precompressed.
+    """
+    vectorize_image(image, output_svg, quality)
+    
+    with open(output_svg, "rb") as src, \
+            gzip.open(f"{output_svg}.gz", "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
 
 async def process_vectorization(
     job_id: str,
-    input_path: str,
-    quality: str
+    image: Union[str, bytes],
+    quality: str,
+    digest: str
 ):
     """
     Background task to process image vectorization.
     
-    This function runs asynchronously in FastAPI's background task queue,
-    allowing the API to return immediately while processing continues.
+    This function runs as an asyncio task scheduled by submit_job(),
+    once run_job() has obtained a job slot, allowing the API to return
+    immediately while processing continues.
+    The CPU-bound vectorization itself is handed to the worker process
+    pool (run_in_pool, which restarts the pool if a worker died); this
+    coroutine only awaits it and records status updates.
     
     Args:
         job_id: Unique identifier for tracking this job
-        input_path: Absolute path to uploaded image file
+        image: Path to the uploaded image file, or its bytes for small
+            uploads kept in memory (see stage_upload)
         quality: Quality preset (fast, balanced, high, ultra)
+        digest: SHA-256 of the uploaded image
+        
+    Result cache:
+        Outputs are keyed by (digest, quality). If an identical image was
+        already vectorized at this quality, its SVG is hardlinked to this
+        job's output path and the worker pool is skipped entirely.
         
     Side Effects:
-        - Updates job_status dictionary with progress
-        - Creates output SVG file in OUTPUT_DIR/{job_id}/
+        - Updates the job store with progress
+        - Creates OUTPUT_DIR/{job_id}_vectorized.svg (and its .gz copy)
         - Logs progress and errors
         
     Error Handling:
         All exceptions are caught and logged. Job status is set to 'failed'
         with error message for client retrieval.
     """
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()  # Monotonic: immune to NTP/DST clock jumps
     
     try:
         # Update status
-        job_status[job_id].status = "processing"
-        job_status[job_id].progress = 10
+        await job_store.update(job_id, status="processing", progress=10)
         
         logger.info(f"[JOB {job_id}] Starting vectorization with quality: {quality}")
         
-        # Output file path
-        base_name = Path(input_path).stem
-        output_base = OUTPUT_DIR / job_id
-        output_base.mkdir(exist_ok=True)
-        
-        output_svg = str(output_base / f"{base_name}_vectorized.svg")
+        # Output file path (flat in OUTPUT_DIR - no per-job directory to create)
+        output_svg = str(OUTPUT_DIR / f"{job_id}_vectorized.svg")
+        cache_key = f"{digest}:{quality}"
         
-        # Update progress
-        job_status[job_id].progress = 30
-        job_status[job_id].message = "Analyzing image..."
-        
-        # Call intelligent vectorizer
-        vectorize_image(input_path, output_svg, quality)
+        cached_svg = await job_store.get_result(cache_key)
+        if cached_svg and _link_cached_output(cached_svg, output_svg):
+            logger.info(f"[JOB {job_id}] Cache hit: reusing {cached_svg}")
+        else:
+            # Update progress
+            await job_store.update(job_id, progress=30, message="Analyzing image...")
+            
+            # Call intelligent vectorizer in a worker process
+            await run_in_pool(run_vectorizer, image, output_svg, quality)
+            await job_store.set_result(cache_key, output_svg)
         
         # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         # Update status to complete
-        job_status[job_id].status = "completed"
-        job_status[job_id].progress = 100
-        job_status[job_id].output_file = output_svg
-        job_status[job_id].processing_time = processing_time
-        job_status[job_id].message = f"Successfully vectorized in {processing_time:.2f}s"
+        await job_store.update(
+            job_id,
+            status="completed",
+            progress=100,
+            output_file=output_svg,
+            processing_time=processing_time,
+            message=f"Successfully vectorized in {processing_time:.2f}s"
+        )
         
         logger.info(f"[JOB {job_id}] Complete! Time: {processing_time:.2f}s")
         
     except Exception as e:
         logger.error(f"[JOB {job_id}] Failed: {str(e)}")
-        job_status[job_id].status = "failed"
-        job_status[job_id].message = f"Processing failed: {str(e)}"
+        await job_store.update(
+            job_id,
+            status="failed",
+            message=f"Processing failed: {str(e)}"
+        )
+
+# Service metadata returned by / (constant, built once at import)
+SERVICE_INFO = {
+    "service": "Vectorizer.dev API v3.0",
+    "version": "3.0.0",
+    "status": "operational",
+    "features": {
+        "lab_color_quantization": "Perceptually-optimized color reduction",
+        "ai_edge_detection": "ML-enhanced hyper-realistic edges",
+        "bezier_smoothing": "Douglas-Peucker + quadratic curves",
+        "rust_acceleration": "30x performance boost"
+    },
+    "quality_levels": ["fast", "balanced", "high", "ultra"]
+}
 
 @app.get("/")
 async def root():
@@ -192,20 +534,29 @@ async def root():
     Returns:
         JSON object with service metadata and feature list
     """
-    return {
-        "service": "Vectorizer.dev API v3.0",
-        "version": "3.0.0",
-        "status": "operational",
-        "features": {
-            "lab_color_quantization": "Perceptually-optimized color reduction",
-            "ai_edge_detection": "ML-enhanced hyper-realistic edges",
-            "bezier_smoothing": "Douglas-Peucker + quadratic curves",
-            "rust_acceleration": "30x performance boost"
-        },
-        "quality_levels": ["fast", "balanced", "high", "ultra"]
-    }
+    return SERVICE_INFO
+
+class HealthStatus(BaseModel):
+    """
+    /health response model.
+    
+    Attributes:
+        status: Always "healthy" while the API is serving requests
+        timestamp: Server time (ISO 8601, second resolution)
+        active_jobs: Number of jobs currently processing
+        queued_jobs: Jobs in this API process waiting for a job slot
+    """
+    status: str
+    timestamp: str
+    active_jobs: int
+    queued_jobs: int
+
+@lru_cache(maxsize=1)
+def _health_timestamp(second: int) -> str:
+    """ISO timestamp for /health, formatted at most once per second"""
+    return datetime.fromtimestamp(second).isoformat()
 
-@app.get("/health")
+@app.get("/health", response_model=HealthStatus)
 async def health_check():
     """
     Health check endpoint for monitoring and load balancers.
@@ -214,17 +565,18 @@ async def health_check():
     to determine if the service is operational.
     
     Returns:
-        JSON with status, timestamp, and count of active processing jobs
+        JSON with status, timestamp, and counts of active (processing)
+        and queued (waiting for a job slot) jobs
     """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "active_jobs": len([j for j in job_status.values() if j.status == "processing"])
-    }
+    return HealthStatus(
+        status="healthy",
+        timestamp=_health_timestamp(int(time.time())),
+        active_jobs=await job_store.active_count(),
+        queued_jobs=len(waiting_jobs)
+    )
 
 @app.post("/api/upload")
 async def upload_image(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     quality: str = "high",
     use_lab: bool = True,
@@ -237,7 +589,6 @@ async def upload_image(
     saves file, and queues background processing job.
     
     Args:
-        background_tasks: FastAPI's background task manager
         file: Uploaded image file (multipart/form-data)
         quality: Processing quality preset (fast, balanced, high, ultra)
         use_lab: Enable LAB color space quantization (premium feature)
@@ -248,6 +599,7 @@ async def upload_image(
         
     Raises:
         HTTPException 400: Invalid file type or quality parameter
+        HTTPException 413: File exceeds MAX_FILE_SIZE
         HTTPException 500: File save failure
         
     Example:
@@ -259,47 +611,44 @@ async def upload_image(
     logger.info(f"[UPLOAD] File: {file.filename} | Quality: {quality}")
     
     # Validate image
-    validate_image(file)
+    file_ext = await validate_image(file)
     
     # Validate quality
-    valid_qualities = ["fast", "balanced", "high", "ultra"]
-    if quality not in valid_qualities:
+    if quality not in VALID_QUALITIES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid quality. Allowed: {', '.join(valid_qualities)}"
+            detail="Invalid quality. Allowed: fast, balanced, high, ultra"
         )
     
     # Generate unique job ID
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
     
-    # Save uploaded file
-    file_ext = Path(file.filename).suffix
+    # Save uploaded file (small uploads stay in memory)
     input_filename = f"{job_id}{file_ext}"
     input_path = UPLOAD_DIR / input_filename
     
     try:
-        with open(input_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        logger.info(f"[JOB {job_id}] File saved: {input_path}")
+        image, digest = await stage_upload(file, input_path)
+        if isinstance(image, bytes):
+            logger.info(f"[JOB {job_id}] File kept in memory: {len(image)} bytes")
+        else:
+            logger.info(f"[JOB {job_id}] File saved: {input_path}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[JOB {job_id}] File save failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
     # Initialize job status
-    job_status[job_id] = VectorizationStatus(
+    await job_store.create(VectorizationStatus(
         job_id=job_id,
         status="queued",
         progress=0,
         message="Image uploaded successfully"
-    )
+    ))
     
     # Start background processing
-    background_tasks.add_task(
-        process_vectorization,
-        job_id,
-        str(input_path),
-        quality
-    )
+    submit_job(job_id, image, quality, digest)
     
     logger.info(f"[JOB {job_id}] Processing queued")
     
@@ -315,7 +664,7 @@ async def upload_image(
         "api_version": "3.0.0"
     }
 
-@app.get("/api/status/{job_id}")
+@app.get("/api/status/{job_id}", response_model=VectorizationStatus)
 async def get_status(job_id: str):
     """
     Get current processing status for a vectorization job.
@@ -332,18 +681,74 @@ async def get_status(job_id: str):
     Raises:
         HTTPException 404: Job ID not found (invalid or expired)
     """
-    if job_id not in job_status:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return job_status[job_id]
+    return job
+
+# Output files are never rewritten (one name per job), so clients and
+# proxies may cache them indefinitely
+DOWNLOAD_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "Vary": "Accept-Encoding",
+}
+
+def _output_stat(path: str) -> Optional[os.stat_result]:
+    """
+    stat() an output file for FileResponse, or None if it is missing.
+    
+    Called inline (a dentry-cached stat takes microseconds), so FileResponse
+    skips its own stat on a threadpool hop. Not cached across requests: an
+    output deleted or rewritten on disk must give a 404 or a fresh
+    size/ETag, and FileResponse only opens the file after sending headers.
+    """
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows a gzip response.
+    
+    gzip (or x-gzip) is accepted when listed with q > 0, or when unlisted
+    and "*" has q > 0; "gzip;q=0" refuses it. Malformed q-values count as
+    0, since the plain SVG is always a safe fallback.
+    """
+    wildcard = None
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        
+        if name in ("gzip", "x-gzip"):
+            return q > 0
+        if name == "*":
+            wildcard = q > 0
+    return bool(wildcard)
 
 @app.get("/api/download/{job_id}")
-async def download_file(job_id: str):
+async def download_file(job_id: str, request: Request):
     """
     Download the generated SVG file for a completed job.
     
     Returns the SVG file as a binary response with proper MIME type.
-    File is served directly from disk without loading into memory.
+    File is served directly from disk without loading into memory
+    (sendfile where the ASGI server supports it), stat()ed once per request.
+    Clients accepting gzip (q > 0) get the precompressed copy
+    (SVG shrinks ~10x) with Content-Encoding: gzip. Responses are marked
+    immutable since a job's output never changes.
     
     Args:
         job_id: UUID of the completed vectorization job
@@ -356,28 +761,41 @@ async def download_file(job_id: str):
         HTTPException 400: Job not completed yet
         HTTPException 404: Output file missing on disk
     """
-    if job_id not in job_status:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = job_status[job_id]
-    
     if job.status != "completed" or not job.output_file:
         raise HTTPException(status_code=400, detail="File not ready")
     
     file_path = Path(job.output_file)
+    stat_result = _output_stat(str(file_path))
     
-    if not file_path.exists():
+    if stat_result is None:
         raise HTTPException(status_code=404, detail="File not found")
     
+    gz_path = file_path.with_name(f"{file_path.name}.gz")
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        gz_stat = _output_stat(str(gz_path))
+        if gz_stat is not None:
+            return FileResponse(
+                path=gz_path,
+                media_type="image/svg+xml",
+                filename=file_path.name,
+                stat_result=gz_stat,
+                headers={"Content-Encoding": "gzip", **DOWNLOAD_HEADERS}
+            )
+    
     return FileResponse(
         path=file_path,
         media_type="image/svg+xml",
-        filename=file_path.name
+        filename=file_path.name,
+        stat_result=stat_result,
+        headers=DOWNLOAD_HEADERS
     )
 
 @app.post("/api/batch")
 async def batch_upload(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     quality: str = "balanced"
 ):
@@ -389,7 +807,6 @@ async def batch_upload(
     All jobs are grouped under a batch_id for collective monitoring.
     
     Args:
-        background_tasks: FastAPI background task manager
         files: List of image files (max 10 per batch)
         quality: Quality preset applied to all files
         
@@ -406,35 +823,39 @@ async def batch_upload(
     if len(files) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 files per batch")
     
-    batch_id = str(uuid.uuid4())
-    job_ids = []
-    
-    for file in files:
-        validate_image(file)
-        
-        job_id = str(uuid.uuid4())
-        file_ext = Path(file.filename).suffix
-        input_filename = f"{job_id}{file_ext}"
-        input_path = UPLOAD_DIR / input_filename
-        
-        with open(input_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        job_status[job_id] = VectorizationStatus(
+    # Validate every file before anything touches the disk
+    file_exts = [await validate_image(file) for file in files]
+    
+    batch_id = uuid.uuid4().hex
+    job_ids = [uuid.uuid4().hex for _ in files]
+    input_paths = [
+        UPLOAD_DIR / f"{job_id}{file_ext}"
+        for job_id, file_ext in zip(job_ids, file_exts)
+    ]
+    
+    # Save all files concurrently rather than one after another
+    staged = await asyncio.gather(*(
+        stage_upload(file, input_path)
+        for file, input_path in zip(files, input_paths)
+    ), return_exceptions=True)
+    
+    # If any upload failed, no job is created - remove the others' files
+    errors = [result for result in staged if isinstance(result, BaseException)]
+    if errors:
+        for result in staged:
+            if isinstance(result, tuple) and isinstance(result[0], str):
+                Path(result[0]).unlink(missing_ok=True)
+        raise errors[0]
+    
+    for job_id, (image, digest) in zip(job_ids, staged):
+        await job_store.create(VectorizationStatus(
             job_id=job_id,
             status="queued",
             progress=0,
             message=f"Batch {batch_id}"
-        )
+        ), batch_id=batch_id)
         
-        background_tasks.add_task(
-            process_vectorization,
-            job_id,
-            str(input_path),
-            quality
-        )
-        
-        job_ids.append(job_id)
+        submit_job(job_id, image, quality, digest)
     
     logger.info(f"[BATCH {batch_id}] {len(files)} files queued")
     
@@ -464,17 +885,18 @@ async def batch_status(batch_id: str):
         HTTPException 404: Batch ID not found
         
     Note:
-        Batch jobs are identified by batch_id in their message field.
-        This is an in-memory implementation - batches are lost on restart.
+        Batch membership comes from the job store's batch index (a Redis
+        list per batch, or a dict in the in-memory fallback), in upload order.
     """
-    batch_jobs = [j for j in job_status.values() if batch_id in j.message]
+    batch_jobs = await job_store.get_batch(batch_id)
     
     if not batch_jobs:
         raise HTTPException(status_code=404, detail="Batch not found")
     
-    completed = len([j for j in batch_jobs if j.status == "completed"])
-    processing = len([j for j in batch_jobs if j.status == "processing"])
-    failed = len([j for j in batch_jobs if j.status == "failed"])
+    counts = Counter(j.status for j in batch_jobs)
+    completed = counts["completed"]
+    processing = counts["processing"]
+    failed = counts["failed"]
     
     return {
         "batch_id": batch_id,
@@ -506,9 +928,20 @@ if __name__ == "__main__":
     print("Health Check: http://localhost:8000/health")
     print("=" * 60)
     
+    # Several uvicorn worker processes only make sense with a shared job
+    # store - otherwise a status poll may land on a worker that never saw
+    # the job. Each worker runs its own MAX_CONCURRENT_JOBS process pool.
+    # uvicorn[standard] brings uvloop + httptools, picked up automatically
+    api_workers = API_WORKERS
+    if api_workers > 1 and isinstance(job_store, InMemoryJobStore):
+        print(f"[WARNING] API_WORKERS={api_workers} needs REDIS_URL - running 1 worker")
+        api_workers = 1
+    
+    # Multiple workers need an import string; a single worker reuses this module
     uvicorn.run(
-        app,
+        "api_server:app" if api_workers > 1 else app,
         host="0.0.0.0",
         port=8000,
+        workers=api_workers,
         log_level="info"
     )
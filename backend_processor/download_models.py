@@ -9,6 +9,8 @@ Author: Bob Vasic (CyberLink Security)
 import hashlib
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Optional
 import urllib.request
@@ -33,42 +35,86 @@ MODEL_REGISTRY = {
 }
 
 MODELS_DIR = Path(__file__).parent / "ai_models"
+MAX_PARALLEL_DOWNLOADS = 4  # Models are fetched concurrently (network-bound)
+
+CHUNK_SIZE = 1 << 20  # 1MB reads for downloads and fallback hashing
+PROGRESS_INTERVAL = 0.2  # Seconds between progress bar redraws
 
 def calculate_sha256(file_path: Path) -> str:
     """Calculate SHA-256 checksum of a file"""
-    sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        # Python 3.11+: hashes in C with the GIL released
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(CHUNK_SIZE), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-def download_file(url: str, dest_path: Path, description: str) -> bool:
-    """Download file with progress indication"""
+def download_file(url: str, dest_path: Path, description: str,
+                  show_progress: bool = True) -> Optional[str]:
+    """
+    Download file with progress indication.
+    
+    The SHA-256 is computed from each chunk as it is written, so
+    verification needs no second read of the file.
+    
+    show_progress redraws a progress bar in place on one terminal line;
+    parallel downloads pass False (their bars would overwrite each other)
+    and print a single completion line instead.
+    
+    Returns:
+        Hex digest of the downloaded file, or None if the download failed
+    """
     try:
         print(f"\n[DOWNLOAD] {description}")
         print(f"[SOURCE] {url}")
         print(f"[DESTINATION] {dest_path}")
         
-        def progress_hook(block_num, block_size, total_size):
-            downloaded = block_num * block_size
-            if total_size > 0:
-                percent = min(downloaded * 100 / total_size, 100)
-                bar_length = 40
-                filled_length = int(bar_length * percent / 100)
-                bar = '█' * filled_length + '-' * (bar_length - filled_length)
-                print(f"\r[{bar}] {percent:.1f}% ({downloaded/1024/1024:.1f}MB)", end='', flush=True)
+        sha256_hash = hashlib.sha256()
+        with urllib.request.urlopen(url) as response, open(dest_path, "wb") as out:
+            total_size = int(response.headers.get("Content-Length") or 0)
+            downloaded = 0
+            last_print = 0.0
+            
+            while chunk := response.read(CHUNK_SIZE):
+                sha256_hash.update(chunk)
+                out.write(chunk)
+                downloaded += len(chunk)
+                
+                # Redraw at most every PROGRESS_INTERVAL seconds (and at 100%)
+                if not show_progress or total_size <= 0:
+                    continue
+                now = time.monotonic()
+                if now - last_print >= PROGRESS_INTERVAL or downloaded >= total_size:
+                    last_print = now
+                    percent = min(downloaded * 100 / total_size, 100)
+                    bar_length = 40
+                    filled_length = int(bar_length * percent / 100)
+                    bar = '█' * filled_length + '-' * (bar_length - filled_length)
+                    print(f"\r[{description}] [{bar}] {percent:.1f}% ({downloaded/1024/1024:.1f}MB)", end='', flush=True)
         
-        urllib.request.urlretrieve(url, dest_path, progress_hook)
-        print()  # New line after progress bar
-        return True
+        if show_progress:
+            print()  # New line after progress bar
+        else:
+            print(f"[DONE] {description} ({downloaded/1024/1024:.1f}MB)")
+        return sha256_hash.hexdigest()
     except Exception as e:
         print(f"\n[ERROR] Download failed: {e}")
-        return False
+        return None
 
-def verify_checksum(file_path: Path, expected_checksum: str) -> bool:
-    """Verify file integrity using SHA-256 checksum"""
-    print(f"[VERIFY] Calculating checksum...")
-    actual_checksum = calculate_sha256(file_path)
+def verify_checksum(file_path: Path, expected_checksum: str,
+                    actual_checksum: Optional[str] = None) -> bool:
+    """
+    Verify file integrity using SHA-256 checksum.
+    
+    Pass actual_checksum when it is already known (e.g. hashed during
+    download) to skip re-reading the file.
+    """
+    if actual_checksum is None:
+        print(f"[VERIFY] Calculating checksum...")
+        actual_checksum = calculate_sha256(file_path)
     
     if actual_checksum == expected_checksum:
         print(f"[SUCCESS] Checksum verified: {actual_checksum[:16]}...")
@@ -79,7 +125,7 @@ def verify_checksum(file_path: Path, expected_checksum: str) -> bool:
         print(f"  Got:      {actual_checksum}")
         return False
 
-def download_model(model_name: str, model_info: Dict) -> bool:
+def download_model(model_name: str, model_info: Dict, show_progress: bool = True) -> bool:
     """Download and verify a single model"""
     print(f"\n{'='*70}")
     print(f"MODEL: {model_name}")
@@ -109,13 +155,15 @@ def download_model(model_name: str, model_info: Dict) -> bool:
         print(f"[INFO] Manual download required for production use")
         return not model_info["required"]
     
-    # Download model
-    if not download_file(model_info["url"], model_path, model_info["description"]):
+    # Download model (hashed on the fly)
+    digest = download_file(model_info["url"], model_path, model_info["description"],
+                           show_progress)
+    if digest is None:
         return False
     
     # Verify checksum if not placeholder
     if model_info["sha256"] != "placeholder_checksum":
-        if not verify_checksum(model_path, model_info["sha256"]):
+        if not verify_checksum(model_path, model_info["sha256"], digest):
             model_path.unlink()  # Delete corrupted file
             return False
     
@@ -132,8 +180,11 @@ def save_model_manifest():
         "models": MODEL_REGISTRY
     }
     
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    # Write a temp file and rename over the manifest: os.replace is atomic,
+    # so readers never see a half-written file if the process dies mid-write
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, manifest_path)
     
     print(f"\n[MANIFEST] Saved to {manifest_path}")
 
@@ -147,17 +198,28 @@ def main():
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     print(f"\n[SETUP] Models directory: {MODELS_DIR}")
     
-    # Download all models
+    # Download all models in parallel - total time is roughly the slowest
+    # download rather than the sum of all of them
     success_count = 0
     required_failed = []
     
-    for model_name, model_info in MODEL_REGISTRY.items():
-        success = download_model(model_name, model_info)
+    # A progress bar only for a lone download; concurrent ones would all
+    # redraw the same terminal line
+    workers = max(1, min(MAX_PARALLEL_DOWNLOADS, len(MODEL_REGISTRY)))
+    show_progress = workers == 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_model, model_name, model_info, show_progress): model_name
+            for model_name, model_info in MODEL_REGISTRY.items()
+        }
         
-        if success:
-            success_count += 1
-        elif model_info["required"]:
-            required_failed.append(model_name)
+        for future in as_completed(futures):
+            model_name = futures[future]
+            
+            if future.result():
+                success_count += 1
+            elif MODEL_REGISTRY[model_name]["required"]:
+                required_failed.append(model_name)
     
     # Save manifest
     save_model_manifest()
@@ -6,11 +6,17 @@ Version: 5.0.0 - QUALITY FOCUSED
 Author: Bob Vasic (CyberLink Security)
 """
 
-from PIL import Image, ImageFilter, ImageEnhance
-import math
-from typing import List, Tuple, Dict
+from PIL import Image, ImageFilter, ImageEnhance, features
+import numpy as np
+import cv2
+from scipy import ndimage
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Mapping, TextIO, Union
 import os
 import io
+from concurrent.futures import ThreadPoolExecutor
+
+from jit_kernels import curvature_corners, douglas_peucker_mask, fit_cubic_beziers, trace_boundary
 
 # Import Rust performance modules
 try:
@@ -29,6 +35,63 @@ except ImportError:
     PREMIUM_FEATURES = False
     print("[PYTHON] Using Python fallback (build Rust for 30x speedup)")
 
+# Corner detection: curvature sampled over +/- CORNER_SPAN boundary points
+CORNER_SPAN = 4
+CORNER_CURVATURE = 0.3  # ~1/radius; a right-angle pixel corner scores ~0.35
+
+# Palette method for the Python fallback quantizer: libimagequant when Pillow
+# was built with it (better palettes at similar speed), else median cut
+QUANTIZE_METHOD = (Image.Quantize.LIBIMAGEQUANT if features.check_feature('libimagequant')
+                   else Image.Quantize.MEDIANCUT)
+
+EDGE_STRIP_ROWS = 256  # Rows per strip in the fallback Sobel (keeps gradients in cache)
+# Rec.709 luma weights (/10000) used by the image crate's grayscale(), which
+# the Rust Sobel runs on
+REC709_LUMA = np.array([2126, 7152, 722], dtype=np.uint32)
+SVG_WRITE_BUFFER = 1 << 20  # Output file buffer; SVG elements are streamed into it
+HEX_BYTE = tuple('%02x' % i for i in range(256))  # Channel value -> two hex digits of a #rrggbb fill
+
+# SVG element templates (%-formatting, filled once per emitted element)
+REGION_PATH_TEMPLATE = '''
+    <path d="%s" fill="#%s%s%s"/>'''
+EDGE_PATH_TEMPLATE = '<path d="M %d %d L %d %d" stroke="rgba(0,0,0,0.1)" stroke-width="0.5" fill="none"/>'
+
+def _stage_threads() -> int:
+    """Threads for the per-color stages: the process's OpenCV thread budget (WORKER_THREADS in API workers)"""
+    return max(1, cv2.getNumThreads())
+
+# Quality presets (read-only, shared by every job)
+QUALITY_SETTINGS = MappingProxyType({
+    'fast': MappingProxyType({
+        'colors': 16,
+        'smoothing': 1,
+        'edge_threshold': 50,
+        'curve_tolerance': 5.0,
+        'blur_radius': 1
+    }),
+    'balanced': MappingProxyType({
+        'colors': 32,
+        'smoothing': 2,
+        'edge_threshold': 40,
+        'curve_tolerance': 3.0,
+        'blur_radius': 1.5
+    }),
+    'high': MappingProxyType({
+        'colors': 64,
+        'smoothing': 3,
+        'edge_threshold': 30,
+        'curve_tolerance': 2.0,
+        'blur_radius': 2.0
+    }),
+    'ultra': MappingProxyType({
+        'colors': 128,
+        'smoothing': 4,
+        'edge_threshold': 20,
+        'curve_tolerance': 1.0,
+        'blur_radius': 2.5
+    })
+})
+
 class IntelligentVectorizer:
     """
     High-quality vectorization that produces SMOOTH vectors, not pixels:
@@ -39,9 +102,14 @@ class IntelligentVectorizer:
     5. Multi-layer composition
     """
     
-    def __init__(self, image_path: str):
-        self.image_path = image_path
-        self.original = Image.open(image_path).convert('RGB')
+    def __init__(self, image_path: Union[str, bytes]):
+        """image_path: file path, or the encoded image bytes (small uploads skip the disk)"""
+        if isinstance(image_path, bytes):
+            self.image_path = None
+            self.original = Image.open(io.BytesIO(image_path)).convert('RGB')
+        else:
+            self.image_path = image_path
+            self.original = Image.open(image_path).convert('RGB')
         self.width, self.height = self.original.size
         
         print(f"[INTELLIGENT-VECTORIZER] Loaded {self.width}x{self.height} image")
@@ -50,6 +118,7 @@ class IntelligentVectorizer:
         """
         Create high-quality smooth vector SVG
         quality: 'fast', 'balanced', 'high', 'ultra'
+        Returns output_path (the SVG is streamed to disk, not kept in memory)
         """
         print(f"\n{'='*60}")
         print(f"INTELLIGENT VECTORIZATION - {quality.upper()} QUALITY")
@@ -62,67 +131,40 @@ class IntelligentVectorizer:
         print("[STEP 1/6] Enhancing image...")
         enhanced = self._enhance_image(settings)
         
-        # Step 2: Color reduction (posterization)
-        print(f"[STEP 2/6] Intelligent color reduction to {settings['colors']} colors...")
-        posterized = self._intelligent_posterize(enhanced, settings['colors'])
-        
-        # Step 3: Extract color regions
-        print("[STEP 3/6] Extracting smooth color regions...")
-        color_regions = self._extract_smooth_regions(posterized, settings)
-        
-        # Step 4: Edge detection
-        print("[STEP 4/6] Detecting edges and contours...")
-        edges = self._detect_edges(enhanced, settings)
+        # Edge detection only needs the enhanced image, so it runs on its own
+        # thread alongside steps 2-3 (PIL, OpenCV and Rust release the GIL)
+        with ThreadPoolExecutor(max_workers=1) as edge_executor:
+            edges_future = edge_executor.submit(self._detect_edges, enhanced, settings)
+            
+            # Step 2: Color reduction (posterization)
+            print(f"[STEP 2/6] Intelligent color reduction to {settings['colors']} colors...")
+            posterized = self._intelligent_posterize(enhanced, settings['colors'])
+            
+            # Step 3: Extract color regions
+            print("[STEP 3/6] Extracting smooth color regions...")
+            color_regions = self._extract_smooth_regions(posterized, settings)
+            
+            # Step 4: Edge detection (started after step 1)
+            print("[STEP 4/6] Detecting edges and contours...")
+            edges = edges_future.result()
         
-        # Step 5: Create vector paths
+        # Step 5+6: Create vector paths, streamed straight into the output file
+        # so the whole document is never assembled in memory
         print("[STEP 5/6] Creating smooth vector paths...")
-        svg_content = self._create_vector_svg(color_regions, edges, settings)
-        
-        # Step 6: Save
         print("[STEP 6/6] Saving SVG...")
-        with open(output_path, 'w') as f:
-            f.write(svg_content)
+        with open(output_path, 'w', buffering=SVG_WRITE_BUFFER) as f:
+            self._create_vector_svg(f, color_regions, edges, settings)
         
         file_size = os.path.getsize(output_path)
         print(f"\n[SUCCESS] High-quality SVG created!")
         print(f"[OUTPUT] {output_path}")
         print(f"[SIZE] {file_size:,} bytes")
         
-        return svg_content
+        return output_path
     
-    def _get_quality_settings(self, quality: str) -> Dict:
+    def _get_quality_settings(self, quality: str) -> Mapping:
         """Get processing settings based on quality level"""
-        settings = {
-            'fast': {
-                'colors': 16,
-                'smoothing': 1,
-                'edge_threshold': 50,
-                'curve_tolerance': 5.0,
-                'blur_radius': 1
-            },
-            'balanced': {
-                'colors': 32,
-                'smoothing': 2,
-                'edge_threshold': 40,
-                'curve_tolerance': 3.0,
-                'blur_radius': 1.5
-            },
-            'high': {
-                'colors': 64,
-                'smoothing': 3,
-                'edge_threshold': 30,
-                'curve_tolerance': 2.0,
-                'blur_radius': 2.0
-            },
-            'ultra': {
-                'colors': 128,
-                'smoothing': 4,
-                'edge_threshold': 20,
-                'curve_tolerance': 1.0,
-                'blur_radius': 2.5
-            }
-        }
-        return settings.get(quality, settings['high'])
+        return QUALITY_SETTINGS.get(quality, QUALITY_SETTINGS['high'])
     
     def _enhance_image(self, settings: Dict) -> Image.Image:
         """Enhance image for better vectorization"""
@@ -144,89 +186,121 @@ class IntelligentVectorizer:
     def _intelligent_posterize(self, image: Image.Image, num_colors: int) -> Image.Image:
         """Reduce colors intelligently using K-means quantization"""
         if RUST_AVAILABLE:
-            buf = io.BytesIO()
-            image.save(buf, format='PNG')
-            img_bytes = list(buf.getvalue())
+            # Raw RGB buffers in and out - no PNG encode/decode on either side
+            pixels = image.tobytes()
             
             # Use premium LAB k-means if available (40% better quality)
             if PREMIUM_FEATURES:
                 try:
-                    result_bytes = rust_core.quantize_colors_lab(img_bytes, num_colors, 10)
+                    result = rust_core.quantize_colors_lab_raw(pixels, image.width, image.height,
+                                                               num_colors, 10)
                     print("   ✨ Using LAB color science (perceptually optimized)")
-                    return Image.open(io.BytesIO(bytes(result_bytes))).convert('RGB')
+                    return Image.frombytes('RGB', image.size, result)
                 except:
                     pass  # Fallback to RGB
             
             # Standard RGB K-means (30x faster)
-            result_bytes = rust_core.quantize_colors(img_bytes, num_colors, 10)
-            return Image.open(io.BytesIO(bytes(result_bytes))).convert('RGB')
+            result = rust_core.quantize_colors_raw(pixels, image.width, image.height,
+                                                   num_colors, 10)
+            return Image.frombytes('RGB', image.size, result)
         else:
             # Python fallback
-            return image.quantize(colors=num_colors, dither=Image.Dither.NONE).convert('RGB')
+            return image.quantize(colors=num_colors, method=QUANTIZE_METHOD,
+                                  dither=Image.Dither.NONE).convert('RGB')
     
     def _extract_smooth_regions(self, image: Image.Image, settings: Dict) -> Dict:
         """Extract color regions and create smooth boundaries"""
         regions = {}
         
-        # Get all unique colors
-        colors = image.getcolors(maxcolors=settings['colors'] * 2)
-        if not colors:
-            colors = image.getcolors(maxcolors=100000)
+        # Pack RGB into one uint32 per pixel so colors compare as scalars
+        arr = np.asarray(image.convert('RGB'), dtype=np.uint8)
+        packed = ((arr[..., 0].astype(np.uint32) << 16)
+                  | (arr[..., 1].astype(np.uint32) << 8)
+                  | arr[..., 2])
         
-        colors = sorted(colors, key=lambda x: x[0], reverse=True)[:settings['colors']]
+        # All unique colors and their pixel counts in one pass, most common first
+        keys, counts = np.unique(packed, return_counts=True)
+        order = np.argsort(-counts, kind='stable')[:settings['colors']]
         
-        print(f"   Found {len(colors)} color regions")
+        print(f"   Found {len(order)} color regions")
         
-        for count, color in colors:
-            if count < 100:  # Skip very small regions
-                continue
-            
-            # Create mask for this color
-            pixels = []
-            for y in range(self.height):
-                for x in range(self.width):
-                    if image.getpixel((x, y)) == color:
-                        pixels.append((x, y))
-            
-            if len(pixels) > settings['edge_threshold']:
-                regions[color] = pixels
+        # Skip very small regions up front: the counts from np.unique are the
+        # region sizes, so no coordinates are built for colors that are dropped
+        kept = [key for key, count in zip(keys[order].tolist(), counts[order].tolist())
+                if count >= 100 and count > settings['edge_threshold']]
+        
+        # Colors are independent, so their pixel lists are gathered concurrently
+        # (the compare and nonzero release the GIL); packed is shared read-only
+        with ThreadPoolExecutor(max_workers=_stage_threads()) as executor:
+            for key, pixels in zip(kept, executor.map(self._region_for_color,
+                                                      [packed] * len(kept), kept)):
+                regions[(key >> 16, (key >> 8) & 0xFF, key & 0xFF)] = pixels
         
         return regions
     
+    def _region_for_color(self, packed: np.ndarray, key: int) -> np.ndarray:
+        """(N, 2) int32 (x, y) coordinates of the pixels with packed color key"""
+        ys, xs = np.nonzero(packed == key)
+        return np.column_stack((xs, ys)).astype(np.int32)
+    
     def _detect_edges(self, image: Image.Image, settings: Dict) -> Image.Image:
         """Detect edges for detail enhancement"""
         if RUST_AVAILABLE:
-            buf = io.BytesIO()
-            image.save(buf, format='PNG')
-            img_bytes = list(buf.getvalue())
             threshold = settings['edge_threshold']
             
             # Use premium AI-enhanced edges if available (20% better quality)
             if PREMIUM_FEATURES:
                 try:
-                    edges_bytes = rust_core.detect_edges_ai(img_bytes, threshold, None)
+                    buf = io.BytesIO()
+                    image.save(buf, format='PNG')
+                    # Passed as bytes: a list would box every byte as a Python int
+                    edges_bytes = rust_core.detect_edges_ai(buf.getvalue(), threshold, None)
                     print("   ✨ Using AI-enhanced edge detection (hyper-realistic)")
                     return Image.open(io.BytesIO(bytes(edges_bytes))).convert('L')
                 except:
                     pass  # Fallback to Sobel
             
-            # Standard Rust Sobel (ultra-fast, 5ms)
-            edges_bytes = rust_core.detect_edges_sobel(img_bytes, threshold)
-            return Image.open(io.BytesIO(bytes(edges_bytes))).convert('L')
+            # Standard Rust Sobel (ultra-fast, 5ms) on the raw pixel buffer - no PNG codec
+            edges = rust_core.detect_edges_sobel_raw(image.tobytes(), image.width, image.height,
+                                                     threshold)
+            return Image.frombytes('L', image.size, edges)
         else:
-            # Python fallback
-            gray = image.convert('L')
-            edges = gray.filter(ImageFilter.FIND_EDGES)
+            # Python fallback: the Rust detect_edges_sobel_raw result, run in row
+            # strips so the float32 gradients of a strip stay cache-resident.
+            # Matches it exactly: Rec.709 integer gray, outer border left 0,
+            # and the threshold applied to the magnitude truncated to u8
+            rgb = np.asarray(image.convert('RGB'))
+            height, width = rgb.shape[:2]
+            edges = np.zeros((height, width), dtype=np.uint8)
             threshold = settings['edge_threshold']
-            edges = edges.point(lambda x: 255 if x > threshold else 0)
-            return edges
+            if height < 3 or width < 3 or threshold >= 255:
+                return Image.fromarray(edges, mode='L')
+            # floor(sqrt(m)) > t  <=>  m >= (t + 1)^2 for integer m
+            min_magnitude_sq = (threshold + 1) ** 2
+            
+            for top in range(0, height, EDGE_STRIP_ROWS):
+                bottom = min(top + EDGE_STRIP_ROWS, height)
+                # One halo row each side; the halo's own output is discarded
+                lo, hi = max(top - 1, 0), min(bottom + 1, height)
+                gray = (rgb[lo:hi] @ REC709_LUMA // 10000).astype(np.float32)
+                grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+                grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+                # Integer gradients (|g| <= 1020): float32 squares are exact
+                magnitude_sq = grad_x * grad_x + grad_y * grad_y
+                edges[top:bottom] = np.where(magnitude_sq[top - lo:bottom - lo] >= min_magnitude_sq, 255, 0)
+            
+            # Rust skips the outer ring of pixels (no full 3x3 neighbourhood)
+            edges[0] = edges[-1] = 0
+            edges[:, 0] = edges[:, -1] = 0
+            return Image.fromarray(edges, mode='L')
     
-    def _create_vector_svg(self, regions: Dict, edges: Image.Image, settings: Dict) -> str:
-        """Create smooth vector SVG with paths"""
-        svg_parts = []
+    def _create_vector_svg(self, fh: TextIO, regions: Dict, edges: Image.Image,
+                           settings: Dict) -> None:
+        """Write smooth vector SVG with paths to fh, one element at a time"""
+        write = fh.write
         
         # SVG header
-        svg_parts.append(f'''<?xml version="1.0" encoding="UTF-8"?>
+        write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" 
      width="{self.width}" 
      height="{self.height}" 
@@ -239,183 +313,158 @@ class IntelligentVectorizer:
     <rect width="100%" height="100%" fill="rgb(255,255,255)"/>
 ''')
         
-        # Add color regions as smooth paths
-        for color, pixels in regions.items():
-            if len(pixels) < 50:
-                continue
-            
-            # Create boundary path
-            boundary = self._extract_boundary(pixels)
-            if len(boundary) < 3:
-                continue
-            
-            # Smooth the boundary
-            smoothed = self._smooth_path(boundary, settings['curve_tolerance'])
-            
-            # Create SVG path
-            path_data = self._create_smooth_path(smoothed)
-            
-            r, g, b = color
-            svg_parts.append(f'''
-    <path d="{path_data}" 
-          fill="rgb({r},{g},{b})" 
-          stroke="none"/>''')
+        # Add color regions as smooth paths; colors are independent, so they
+        # are traced concurrently (NumPy/SciPy/numba kernels release the GIL).
+        # Region paths inherit stroke="none" from one group
+        tolerance = settings['curve_tolerance']
+        write('    <g stroke="none">')
+        with ThreadPoolExecutor(max_workers=_stage_threads()) as executor:
+            for region_svg in executor.map(self._color_to_svg, regions.keys(),
+                                           regions.values(), [tolerance] * len(regions)):
+                write(region_svg)
+        write('\n    </g>')
         
         # Add edge details
         edge_paths = self._edges_to_paths(edges, settings)
         if edge_paths:
-            svg_parts.append(edge_paths)
+            write(edge_paths)
         
         # Close SVG
-        svg_parts.append('\n</svg>')
-        
-        return ''.join(svg_parts)
+        write('\n</svg>')
     
-    def _extract_boundary(self, pixels: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """Extract boundary points from region"""
-        pixel_set = set(pixels)
-        boundary = []
-        
-        for x, y in pixels:
-            # Check if on boundary
-            is_boundary = False
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                if (x+dx, y+dy) not in pixel_set:
-                    is_boundary = True
-                    break
-            
-            if is_boundary:
-                boundary.append((x, y))
+    def _color_to_svg(self, color: Tuple[int, int, int], pixels: np.ndarray,
+                      tolerance: float) -> str:
+        """Vectorize one color region (one path per connected blob)"""
+        if len(pixels) < 50:
+            return ""
         
-        # Sort boundary points to form continuous path
-        if boundary:
-            boundary = self._order_boundary_points(boundary)
+        r, g, b = color
+        paths = []
+        for mask, origin in self._split_components(pixels, 50):
+            # Create boundary path
+            boundary = self._extract_boundary(mask, origin)
+            if len(boundary) < 3:
+                continue
+            
+            # Simplify and fit curves to the boundary
+            path_data = self._create_smooth_path(boundary, tolerance)
+            
+            paths.append(REGION_PATH_TEMPLATE % (path_data, HEX_BYTE[r], HEX_BYTE[g], HEX_BYTE[b]))
         
-        return boundary
+        return "".join(paths)
     
-    def _order_boundary_points(self, points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """Order boundary points to form continuous path"""
-        if len(points) <= 2:
-            return points
+    def _split_components(self, pixels: np.ndarray, 
+                          min_size: int) -> List[Tuple[np.ndarray, Tuple[int, int]]]:
+        """Split a color region into 8-connected blobs (connected-component labeling)
         
-        ordered = [points[0]]
-        remaining = set(points[1:])
+        Returns (mask, origin) pairs: a bool mask cropped to each blob's
+        bounding box and the (x, y) offset of that box in the image.
+        """
+        pts = np.asarray(pixels)
+        mask = np.zeros((self.height, self.width), dtype=np.bool_)
+        mask[pts[:, 1], pts[:, 0]] = True
         
-        while remaining and len(ordered) < len(points):
-            current = ordered[-1]
-            # Find nearest point
-            nearest = min(remaining, 
-                         key=lambda p: (p[0]-current[0])**2 + (p[1]-current[1])**2)
-            ordered.append(nearest)
-            remaining.remove(nearest)
-            
-            if len(ordered) > 5000:  # Prevent infinite loops
-                break
+        labels, _ = ndimage.label(mask, structure=np.ones((3, 3), dtype=np.bool_))
+        sizes = np.bincount(labels.ravel())
         
+        components = []
+        for label, slc in enumerate(ndimage.find_objects(labels), start=1):
+            if slc is None or sizes[label] < min_size:
+                continue
+            components.append((labels[slc] == label, (slc[1].start, slc[0].start)))
+        
+        return components
+    
+    def _extract_boundary(self, mask: np.ndarray, 
+                          origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+        """Extract ordered (K, 2) int32 boundary points from a region mask"""
+        # Pixels with a 4-neighbour outside the region (image border counts as outside)
+        eroded = ndimage.binary_erosion(mask, structure=ndimage.generate_binary_structure(2, 1))
+        boundary = mask & ~eroded
+        if not boundary.any():
+            return np.empty((0, 2), dtype=np.int32)
+        
+        # Order boundary points by Moore-neighbor contour tracing (linear time)
+        ordered = trace_boundary(boundary)
+        ordered += np.asarray(origin, dtype=np.int32)
         return ordered
     
-    def _smooth_path(self, points: List[Tuple[int, int]], tolerance: float) -> List[Tuple[int, int]]:
+    def _smooth_path(self, points: np.ndarray, tolerance: float) -> np.ndarray:
         """Smooth path using Douglas-Peucker algorithm"""
+        points = np.asarray(points)
         if len(points) <= 2:
             return points
         
         return self._douglas_peucker(points, tolerance)
     
-    def _douglas_peucker(self, points: List[Tuple[int, int]], epsilon: float) -> List[Tuple[int, int]]:
-        """Douglas-Peucker path simplification"""
+    def _douglas_peucker(self, points: np.ndarray, epsilon: float) -> np.ndarray:
+        """Douglas-Peucker path simplification (JIT kernel, iterative)"""
         if len(points) <= 2:
             return points
         
-        # Find point with maximum distance
-        max_dist = 0
-        max_index = 0
-        
-        for i in range(1, len(points) - 1):
-            dist = self._perpendicular_distance(points[i], points[0], points[-1])
-            if dist > max_dist:
-                max_dist = dist
-                max_index = i
-        
-        # If max distance is greater than epsilon, recursively simplify
-        if max_dist > epsilon:
-            left = self._douglas_peucker(points[:max_index+1], epsilon)
-            right = self._douglas_peucker(points[max_index:], epsilon)
-            return left[:-1] + right
-        else:
-            return [points[0], points[-1]]
-    
-    def _perpendicular_distance(self, point: Tuple[int, int], 
-                                line_start: Tuple[int, int], 
-                                line_end: Tuple[int, int]) -> float:
-        """Calculate perpendicular distance from point to line"""
-        x0, y0 = point
-        x1, y1 = line_start
-        x2, y2 = line_end
-        
-        line_length = math.sqrt((x2-x1)**2 + (y2-y1)**2)
-        
-        if line_length == 0:
-            return math.sqrt((x0-x1)**2 + (y0-y1)**2)
-        
-        return abs((y2-y1)*x0 - (x2-x1)*y0 + x2*y1 - y2*x1) / line_length
+        keep = douglas_peucker_mask(points.astype(np.float64, copy=False), float(epsilon))
+        return points[keep]
     
-    def _create_smooth_path(self, points: List[Tuple[int, int]]) -> str:
-        """Create smooth SVG path with Bezier curves"""
+    def _create_smooth_path(self, points: np.ndarray, tolerance: float = 1.0) -> str:
+        """Create smooth SVG path with cubic Bezier curves (Schneider fit)"""
         if len(points) < 2:
             return ""
         
-        path = [f"M {points[0][0]} {points[0][1]}"]
-        
-        # Use quadratic Bezier curves for smoothness
-        for i in range(1, len(points) - 1):
-            x0, y0 = points[i-1]
-            x1, y1 = points[i]
-            x2, y2 = points[i+1] if i+1 < len(points) else points[i]
-            
-            # Calculate control point
-            cx = x1
-            cy = y1
-            
-            # End point (midpoint to next)
-            ex = (x1 + x2) / 2
-            ey = (y1 + y2) / 2
-            
-            path.append(f"Q {cx} {cy} {ex} {ey}")
+        segments = self._split_at_corners(points)
+        path = ["M %d %d" % tuple(segments[0][0])]
+        for segment in segments:
+            # Simplify, then fit each corner-to-corner run on its own
+            simplified = self._smooth_path(segment, tolerance)
+            curves = fit_cubic_beziers(simplified, tolerance)
+            for ctrl in curves.round(1).tolist():
+                path.append("C %g %g %g %g %g %g" % (*ctrl[1], *ctrl[2], *ctrl[3]))
         
         # Close path
         path.append("Z")
         
         return " ".join(path)
     
+    def _split_at_corners(self, points: np.ndarray) -> List[np.ndarray]:
+        """Cut a closed contour into open runs between curvature extrema"""
+        pts = np.asarray(points, dtype=np.float64)
+        corners = curvature_corners(pts, CORNER_SPAN, CORNER_CURVATURE)
+        
+        # Rotate so the contour starts at a corner (or at its first point)
+        start = corners[0] if len(corners) else 0
+        pts = np.roll(pts, -start, axis=0)
+        closed = np.vstack([pts, pts[:1]])
+        cuts = [0] + (corners[1:] - start).tolist() + [len(pts)]
+        
+        return [closed[lo:hi + 1] for lo, hi in zip(cuts[:-1], cuts[1:])]
+    
     def _edges_to_paths(self, edges: Image.Image, settings: Dict) -> str:
-        """Convert edge image to vector paths"""
-        # Sample edges
-        paths = []
-        edge_data = list(edges.getdata())
-        
-        # Find edge segments
-        for y in range(0, self.height, 5):
-            segment = []
-            for x in range(self.width):
-                idx = y * self.width + x
-                if idx < len(edge_data) and edge_data[idx] > 128:
-                    segment.append((x, y))
-                elif segment:
-                    if len(segment) > 10:
-                        # Create path from segment
-                        path_data = f"M {segment[0][0]} {segment[0][1]}"
-                        for point in segment[1:]:
-                            path_data += f" L {point[0]} {point[1]}"
-                        paths.append(f'<path d="{path_data}" stroke="rgba(0,0,0,0.1)" stroke-width="0.5" fill="none"/>')
-                    segment = []
+        """Convert edge image to vector paths (one line per horizontal edge run)"""
+        # Sample every 5th row; pad with a zero column on each side so every
+        # run has both a rising and a falling transition
+        sampled = np.asarray(edges)[::5] > 128
+        padded = np.zeros((sampled.shape[0], sampled.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = sampled
+        transitions = np.diff(padded, axis=1)
+        
+        # nonzero() walks row-major, so starts and ends pair up run by run
+        rows, starts = np.nonzero(transitions == 1)
+        _, ends = np.nonzero(transitions == -1)
+        long_runs = ends - starts > 10
+        
+        paths = [EDGE_PATH_TEMPLATE % (x0, y, x1 - 1, y)
+                 for y, x0, x1 in zip((rows[long_runs] * 5).tolist(),
+                                      starts[long_runs].tolist(),
+                                      ends[long_runs].tolist())]
         
         return '\n    '.join(paths) if paths else ""
 
-
-def vectorize_image(input_path: str, output_path: str, quality: str = 'high') -> str:
+def vectorize_image(input_path: Union[str, bytes], output_path: str,
+                    quality: str = 'high') -> str:
     """
     Main entry point for intelligent vectorization
     Uses professional vectorization engine for high-fidelity output
+    input_path may also be the encoded image bytes
+    Returns the path of the written SVG
     """
     try:
         # Use professional vectorizer (OpenCV-based, superior quality)
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+CyberLink Security - JIT Numeric Kernels
+Numba-compiled inner loops shared by the vectorizers
+Version: 1.0.0
+Author: Bob Vasic (CyberLink Security)
+"""
+
+import math
+import numpy as np
+
+# Numba is optional - without it the kernels run as plain Python/NumPy
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, nogil=True)
+def douglas_peucker_mask(points: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification over an (N, 2) float array.
+    Returns a boolean mask of the points to keep (endpoints always kept).
+    Uses an explicit segment stack instead of recursion and compares
+    squared distances, so no sqrt is taken per candidate point.
+    """
+    n = points.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    if n == 0:
+        return keep
+    keep[0] = True
+    keep[n - 1] = True
+    if n < 3:
+        return keep
+
+    eps2 = epsilon * epsilon
+    stack = np.empty((n, 2), dtype=np.int64)
+    stack[0, 0] = 0
+    stack[0, 1] = n - 1
+    top = 1
+
+    while top > 0:
+        top -= 1
+        lo = stack[top, 0]
+        hi = stack[top, 1]
+        if hi - lo < 2:
+            continue
+
+        x1 = points[lo, 0]
+        y1 = points[lo, 1]
+        x2 = points[hi, 0]
+        y2 = points[hi, 1]
+        dx = x2 - x1
+        dy = y2 - y1
+        len_sq = dx * dx + dy * dy
+        cross = x2 * y1 - y2 * x1
+
+        # len_sq is fixed per segment, so the farthest point is the one
+        # with the largest squared numerator
+        best = -1.0
+        best_idx = lo
+        for i in range(lo + 1, hi):
+            x0 = points[i, 0]
+            y0 = points[i, 1]
+            if len_sq == 0.0:
+                d = (x0 - x1) * (x0 - x1) + (y0 - y1) * (y0 - y1)
+            else:
+                num = dy * x0 - dx * y0 + cross
+                d = num * num
+            if d > best:
+                best = d
+                best_idx = i
+
+        limit = eps2 if len_sq == 0.0 else eps2 * len_sq
+        if best > limit:
+            keep[best_idx] = True
+            stack[top, 0] = lo
+            stack[top, 1] = best_idx
+            stack[top + 1, 0] = best_idx
+            stack[top + 1, 1] = hi
+            top += 2
+
+    return keep
+
+
+# Moore neighbourhood in clockwise order (image coords, y down), starting West
+_MOORE_DX = np.array([-1, -1, 0, 1, 1, 1, 0, -1], dtype=np.int64)
+_MOORE_DY = np.array([0, -1, -1, -1, 0, 1, 1, 1], dtype=np.int64)
+# (dy + 1) * 3 + (dx + 1) -> Moore direction index
+_OFFSET_TO_DIR = np.array([1, 2, 3, 0, -1, 4, 7, 6, 5], dtype=np.int64)
+
+
+@njit(cache=True, nogil=True)
+def trace_boundary(mask: np.ndarray) -> np.ndarray:
+    """
+    Moore-neighbor contour tracing.
+    Traces the outer boundary of the component holding the first set
+    pixel (raster order) and returns it as an ordered (K, 2) int32 array
+    of (x, y) points. Runs in time linear in the boundary length.
+    """
+    h, w = mask.shape
+    sx = -1
+    sy = -1
+    for y in range(h):
+        for x in range(w):
+            if mask[y, x]:
+                sx = x
+                sy = y
+                break
+        if sx >= 0:
+            break
+    if sx < 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    cap = 64
+    out = np.empty((cap, 2), dtype=np.int32)
+    out[0, 0] = sx
+    out[0, 1] = sy
+    n = 1
+
+    # Raster scan guarantees the west neighbour of the start is background
+    cx = sx
+    cy = sy
+    back = 0
+    first_dir = -1
+    for _ in range(8 * h * w + 8):
+        found = -1
+        for k in range(1, 8):
+            d = (back + k) % 8
+            nx = cx + _MOORE_DX[d]
+            ny = cy + _MOORE_DY[d]
+            if 0 <= nx < w and 0 <= ny < h and mask[ny, nx]:
+                found = d
+                break
+        if found < 0:
+            break  # isolated pixel
+
+        if cx == sx and cy == sy:
+            # The state after a move depends only on its direction, so
+            # leaving the start the same way again means the walk is closed
+            if first_dir < 0:
+                first_dir = found
+            elif found == first_dir:
+                break
+            else:
+                # Start pixel revisited mid-contour (thin connection)
+                if n == cap:
+                    grown = np.empty((cap * 2, 2), dtype=np.int32)
+                    grown[:n] = out[:n]
+                    out = grown
+                    cap *= 2
+                out[n, 0] = cx
+                out[n, 1] = cy
+                n += 1
+
+        # The last background pixel checked becomes the new backtrack
+        pd = (found + 7) % 8
+        px = cx + _MOORE_DX[pd]
+        py = cy + _MOORE_DY[pd]
+        cx += _MOORE_DX[found]
+        cy += _MOORE_DY[found]
+        back = _OFFSET_TO_DIR[(py - cy + 1) * 3 + (px - cx + 1)]
+
+        if cx == sx and cy == sy:
+            continue
+
+        if n == cap:
+            grown = np.empty((cap * 2, 2), dtype=np.int32)
+            grown[:n] = out[:n]
+            out = grown
+            cap *= 2
+        out[n, 0] = cx
+        out[n, 1] = cy
+        n += 1
+
+    return out[:n]
+
+
+@njit(cache=True, nogil=True)
+def _unit(x: float, y: float):
+    """Normalize a 2D vector (zero vector stays zero)"""
+    norm = math.sqrt(x * x + y * y)
+    if norm == 0.0:
+        return 0.0, 0.0
+    return x / norm, y / norm
+
+
+@njit(cache=True, nogil=True)
+def _bezier_eval(ctrl: np.ndarray, t: float):
+    """Point on a cubic Bezier (4, 2) at parameter t"""
+    mt = 1.0 - t
+    b0 = mt * mt * mt
+    b1 = 3.0 * mt * mt * t
+    b2 = 3.0 * mt * t * t
+    b3 = t * t * t
+    x = b0 * ctrl[0, 0] + b1 * ctrl[1, 0] + b2 * ctrl[2, 0] + b3 * ctrl[3, 0]
+    y = b0 * ctrl[0, 1] + b1 * ctrl[1, 1] + b2 * ctrl[2, 1] + b3 * ctrl[3, 1]
+    return x, y
+
+
+@njit(cache=True, nogil=True)
+def _fit_single_cubic(points: np.ndarray, lo: int, hi: int, u: np.ndarray,
+                      t1x: float, t1y: float, t2x: float, t2y: float,
+                      ctrl: np.ndarray):
+    """Least-squares handle lengths for fixed end tangents (2x2 normal equations)"""
+    p0x = points[lo, 0]
+    p0y = points[lo, 1]
+    p3x = points[hi, 0]
+    p3y = points[hi, 1]
+
+    c00 = 0.0
+    c01 = 0.0
+    c11 = 0.0
+    x0 = 0.0
+    x1 = 0.0
+    for i in range(lo, hi + 1):
+        t = u[i - lo]
+        mt = 1.0 - t
+        b0 = mt * mt * mt
+        b1 = 3.0 * mt * mt * t
+        b2 = 3.0 * mt * t * t
+        b3 = t * t * t
+        a0x = t1x * b1
+        a0y = t1y * b1
+        a1x = t2x * b2
+        a1y = t2y * b2
+        c00 += a0x * a0x + a0y * a0y
+        c01 += a0x * a1x + a0y * a1y
+        c11 += a1x * a1x + a1y * a1y
+        rx = points[i, 0] - (p0x * (b0 + b1) + p3x * (b2 + b3))
+        ry = points[i, 1] - (p0y * (b0 + b1) + p3y * (b2 + b3))
+        x0 += a0x * rx + a0y * ry
+        x1 += a1x * rx + a1y * ry
+
+    det = c00 * c11 - c01 * c01
+    alpha_l = 0.0
+    alpha_r = 0.0
+    if det != 0.0:
+        alpha_l = (x0 * c11 - x1 * c01) / det
+        alpha_r = (c00 * x1 - c01 * x0) / det
+
+    # Degenerate or backwards handles: fall back to the Wu/Barsky heuristic
+    seg_len = math.sqrt((p3x - p0x) ** 2 + (p3y - p0y) ** 2)
+    eps = 1e-6 * seg_len
+    if alpha_l < eps or alpha_r < eps:
+        alpha_l = seg_len / 3.0
+        alpha_r = seg_len / 3.0
+
+    ctrl[0, 0] = p0x
+    ctrl[0, 1] = p0y
+    ctrl[1, 0] = p0x + t1x * alpha_l
+    ctrl[1, 1] = p0y + t1y * alpha_l
+    ctrl[2, 0] = p3x + t2x * alpha_r
+    ctrl[2, 1] = p3y + t2y * alpha_r
+    ctrl[3, 0] = p3x
+    ctrl[3, 1] = p3y
+
+
+@njit(cache=True, nogil=True)
+def _max_fit_error(points: np.ndarray, lo: int, hi: int, u: np.ndarray,
+                   ctrl: np.ndarray):
+    """Largest squared distance from the points to the curve, and where"""
+    max_dist = 0.0
+    split = (lo + hi) // 2
+    for i in range(lo + 1, hi):
+        bx, by = _bezier_eval(ctrl, u[i - lo])
+        dx = bx - points[i, 0]
+        dy = by - points[i, 1]
+        d = dx * dx + dy * dy
+        if d >= max_dist:
+            max_dist = d
+            split = i
+    return max_dist, split
+
+
+@njit(cache=True, nogil=True)
+def _reparameterize(points: np.ndarray, lo: int, hi: int, u: np.ndarray,
+                    ctrl: np.ndarray):
+    """One Newton-Raphson step per parameter towards the closest curve point"""
+    for i in range(lo, hi + 1):
+        t = u[i - lo]
+        mt = 1.0 - t
+        qx, qy = _bezier_eval(ctrl, t)
+        # First and second derivatives of the cubic
+        d1x = 3.0 * (mt * mt * (ctrl[1, 0] - ctrl[0, 0]) + 2.0 * mt * t * (ctrl[2, 0] - ctrl[1, 0])
+                     + t * t * (ctrl[3, 0] - ctrl[2, 0]))
+        d1y = 3.0 * (mt * mt * (ctrl[1, 1] - ctrl[0, 1]) + 2.0 * mt * t * (ctrl[2, 1] - ctrl[1, 1])
+                     + t * t * (ctrl[3, 1] - ctrl[2, 1]))
+        d2x = 6.0 * (mt * (ctrl[2, 0] - 2.0 * ctrl[1, 0] + ctrl[0, 0])
+                     + t * (ctrl[3, 0] - 2.0 * ctrl[2, 0] + ctrl[1, 0]))
+        d2y = 6.0 * (mt * (ctrl[2, 1] - 2.0 * ctrl[1, 1] + ctrl[0, 1])
+                     + t * (ctrl[3, 1] - 2.0 * ctrl[2, 1] + ctrl[1, 1]))
+        ex = qx - points[i, 0]
+        ey = qy - points[i, 1]
+        num = ex * d1x + ey * d1y
+        den = d1x * d1x + d1y * d1y + ex * d2x + ey * d2y
+        if den != 0.0:
+            u[i - lo] = min(1.0, max(0.0, t - num / den))
+
+
+@njit(cache=True, nogil=True)
+def fit_cubic_beziers(points: np.ndarray, max_error: float) -> np.ndarray:
+    """
+    Schneider's cubic Bezier fitting over an ordered (N, 2) float polyline.
+    Each span gets a least-squares cubic with chord-length parameters,
+    refined by Newton-Raphson; spans still off by more than max_error are
+    split at their worst point. Returns (M, 4, 2) control points in order.
+    """
+    n = points.shape[0]
+    if n < 2:
+        return np.empty((0, 4, 2), dtype=np.float64)
+
+    err2 = max_error * max_error
+    out = np.empty((n - 1, 4, 2), dtype=np.float64)
+    m = 0
+
+    # Explicit stack of (lo, hi, t1x, t1y, t2x, t2y); left spans pop first
+    stack_idx = np.empty((n, 2), dtype=np.int64)
+    stack_tan = np.empty((n, 4), dtype=np.float64)
+    t1x, t1y = _unit(points[1, 0] - points[0, 0], points[1, 1] - points[0, 1])
+    t2x, t2y = _unit(points[n - 2, 0] - points[n - 1, 0], points[n - 2, 1] - points[n - 1, 1])
+    stack_idx[0, 0] = 0
+    stack_idx[0, 1] = n - 1
+    stack_tan[0, 0] = t1x
+    stack_tan[0, 1] = t1y
+    stack_tan[0, 2] = t2x
+    stack_tan[0, 3] = t2y
+    top = 1
+
+    ctrl = np.empty((4, 2), dtype=np.float64)
+    u = np.empty(n, dtype=np.float64)
+    while top > 0:
+        top -= 1
+        lo = stack_idx[top, 0]
+        hi = stack_idx[top, 1]
+        t1x = stack_tan[top, 0]
+        t1y = stack_tan[top, 1]
+        t2x = stack_tan[top, 2]
+        t2y = stack_tan[top, 3]
+
+        if hi - lo == 1:
+            # Two points: straight cubic with handles at a third of the chord
+            dist = math.sqrt((points[hi, 0] - points[lo, 0]) ** 2
+                             + (points[hi, 1] - points[lo, 1]) ** 2) / 3.0
+            out[m, 0, 0] = points[lo, 0]
+            out[m, 0, 1] = points[lo, 1]
+            out[m, 1, 0] = points[lo, 0] + t1x * dist
+            out[m, 1, 1] = points[lo, 1] + t1y * dist
+            out[m, 2, 0] = points[hi, 0] + t2x * dist
+            out[m, 2, 1] = points[hi, 1] + t2y * dist
+            out[m, 3, 0] = points[hi, 0]
+            out[m, 3, 1] = points[hi, 1]
+            m += 1
+            continue
+
+        # Chord-length parameterization
+        u[0] = 0.0
+        for i in range(lo + 1, hi + 1):
+            k = i - lo
+            u[k] = u[k - 1] + math.sqrt((points[i, 0] - points[i - 1, 0]) ** 2
+                                        + (points[i, 1] - points[i - 1, 1]) ** 2)
+        total = u[hi - lo]
+        for k in range(hi - lo + 1):
+            u[k] = u[k] / total if total > 0.0 else k / (hi - lo)
+
+        _fit_single_cubic(points, lo, hi, u, t1x, t1y, t2x, t2y, ctrl)
+        max_dist, split = _max_fit_error(points, lo, hi, u, ctrl)
+
+        # Close misses are usually fixed by reparameterizing, not splitting
+        if err2 < max_dist <= 4.0 * err2:
+            for _ in range(4):
+                _reparameterize(points, lo, hi, u, ctrl)
+                _fit_single_cubic(points, lo, hi, u, t1x, t1y, t2x, t2y, ctrl)
+                max_dist, split = _max_fit_error(points, lo, hi, u, ctrl)
+                if max_dist <= err2:
+                    break
+
+        if max_dist <= err2:
+            out[m] = ctrl
+            m += 1
+            continue
+
+        # Split at the worst point, sharing a tangent across the joint
+        cx, cy = _unit(points[split - 1, 0] - points[split + 1, 0],
+                       points[split - 1, 1] - points[split + 1, 1])
+        stack_idx[top, 0] = split
+        stack_idx[top, 1] = hi
+        stack_tan[top, 0] = -cx
+        stack_tan[top, 1] = -cy
+        stack_tan[top, 2] = t2x
+        stack_tan[top, 3] = t2y
+        stack_idx[top + 1, 0] = lo
+        stack_idx[top + 1, 1] = split
+        stack_tan[top + 1, 0] = t1x
+        stack_tan[top + 1, 1] = t1y
+        stack_tan[top + 1, 2] = cx
+        stack_tan[top + 1, 3] = cy
+        top += 2
+
+    return out[:m]
+
+
+@njit(cache=True, nogil=True)
+def curvature_corners(points: np.ndarray, span: int, threshold: float) -> np.ndarray:
+    """
+    Corner indices of a closed (K, 2) contour.
+    Curvature at k is the discrete determinant estimate over P[k-span],
+    P[k], P[k+span]; corners are the local maxima of |curvature| within
+    +/- span that exceed threshold. Returns sorted int64 indices.
+    """
+    k_total = points.shape[0]
+    if k_total < 2 * span + 1:
+        return np.empty(0, dtype=np.int64)
+
+    kappa = np.zeros(k_total, dtype=np.float64)
+    for k in range(k_total):
+        a = (k - span) % k_total
+        b = (k + span) % k_total
+        v1x = points[k, 0] - points[a, 0]
+        v1y = points[k, 1] - points[a, 1]
+        v2x = points[b, 0] - points[k, 0]
+        v2y = points[b, 1] - points[k, 1]
+        cx = points[b, 0] - points[a, 0]
+        cy = points[b, 1] - points[a, 1]
+        den = math.sqrt((v1x * v1x + v1y * v1y) * (v2x * v2x + v2y * v2y) * (cx * cx + cy * cy))
+        if den > 0.0:
+            kappa[k] = abs(2.0 * (v1x * v2y - v1y * v2x)) / den
+
+    corners = np.empty(k_total, dtype=np.int64)
+    n = 0
+    for k in range(k_total):
+        if kappa[k] <= threshold:
+            continue
+        # Non-maximum suppression; ties go to the earliest index
+        is_max = True
+        for j in range(1, span + 1):
+            if kappa[(k + j) % k_total] > kappa[k] or kappa[(k - j) % k_total] >= kappa[k]:
+                is_max = False
+                break
+        if is_max:
+            corners[n] = k
+            n += 1
+    return corners[:n]
+
+
+def warm_up() -> None:
+    """
+    Compile (or load from the on-disk cache) every kernel ahead of time.
+    
+    Called once per API worker process so the first job does not pay
+    JIT compilation; the inputs match the dtypes the vectorizers pass.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    
+    mask = np.zeros((4, 4), dtype=np.bool_)
+    mask[1:3, 1:3] = True
+    trace_boundary(mask)
+    
+    square = np.array([[0, 0], [4, 0], [4, 4], [0, 4]], dtype=np.float64)
+    douglas_peucker_mask(square, 1.0)
+    fit_cubic_beziers(square, 1.0)
+    curvature_corners(square, 1, 0.3)
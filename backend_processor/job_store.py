@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+CyberLink Security - Job Status Store
+
+Shared job tracking for the vectorization API.
+
+Backends:
+- RedisJobStore: one hash per job (job:{id}) with a TTL, a list per batch
+  (batch:{id}) and an active_job_starts sorted set. Shared by every uvicorn
+  worker and survives API restarts.
+- InMemoryJobStore: process-local dict, used when Redis is not configured.
+  Single worker only; jobs are lost on restart. Jobs older than the same
+  24h TTL are evicted as new jobs arrive.
+
+Both also keep a result cache mapping "{sha256}:{quality}" to the SVG a
+previous job produced, so identical uploads skip vectorization.
+
+Set REDIS_URL (e.g. redis://localhost:6379/0) to enable the Redis backend.
+
+Version: 1.0.0
+Author: Bob Vasic (CyberLink Security)
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Set, Tuple
+import logging
+import os
+import time
+
+# Redis is optional - without it job status lives in process memory
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL_SECONDS = 24 * 60 * 60  # Job records expire after 24h
+RESULT_TTL_SECONDS = 7 * 24 * 60 * 60  # Cached results are reused for 7 days
+
+
+class VectorizationStatus(BaseModel):
+    """
+    Job status tracking model.
+
+    Attributes:
+        job_id: Unique UUID identifier for the job
+        status: Current state (queued, processing, completed, failed)
+        progress: Completion percentage (0-100)
+        message: Human-readable status message
+        output_file: Absolute path to generated SVG (when completed)
+        processing_time: Total processing duration in seconds
+        batch_id: UUID of the batch this job was uploaded in (if any)
+    """
+    job_id: str
+    status: str  # queued | processing | completed | failed
+    progress: int  # 0-100
+    message: Optional[str] = None
+    output_file: Optional[str] = None
+    processing_time: Optional[float] = None
+    batch_id: Optional[str] = None
+
+
+class InMemoryJobStore:
+    """
+    Process-local job store.
+
+    NOTE: Only valid with a single uvicorn worker - other workers cannot
+    see these jobs, and everything is lost on restart.
+    """
+
+    def __init__(self):
+        # Key: job_id (UUID string), Value: VectorizationStatus object
+        self.jobs: Dict[str, VectorizationStatus] = {}
+        # Key: batch_id, Value: job_ids in upload order
+        self.batches: Dict[str, List[str]] = {}
+        # job_ids currently processing (kept in step by update())
+        self.active: Set[str] = set()
+        # Key: job_id, Value: monotonic creation time (insertion-ordered)
+        self.created: Dict[str, float] = {}
+        # Key: "{sha256}:{quality}", Value: (output_file, monotonic store time)
+        self.results: Dict[str, Tuple[str, float]] = {}
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop jobs older than JOB_TTL_SECONDS (oldest first, stops at the first live one)"""
+        while self.created:
+            job_id = next(iter(self.created))
+            if now - self.created[job_id] < JOB_TTL_SECONDS:
+                break
+            del self.created[job_id]
+            job = self.jobs.pop(job_id, None)
+            self.active.discard(job_id)
+            if job is not None and job.batch_id in self.batches:
+                batch = self.batches[job.batch_id]
+                batch.remove(job_id)
+                if not batch:
+                    del self.batches[job.batch_id]
+
+    async def create(self, status: VectorizationStatus,
+                     batch_id: Optional[str] = None) -> None:
+        """Register a new job (optionally as part of a batch)"""
+        now = time.monotonic()
+        self._evict_expired(now)
+        self.jobs[status.job_id] = status
+        self.created[status.job_id] = now
+        if batch_id:
+            status.batch_id = batch_id
+            self.batches.setdefault(batch_id, []).append(status.job_id)
+
+    async def update(self, job_id: str, **fields) -> None:
+        """Set one or more status fields on an existing job"""
+        job = self.jobs[job_id]
+        for name, value in fields.items():
+            setattr(job, name, value)
+
+        if fields.get("status") == "processing":
+            self.active.add(job_id)
+        elif "status" in fields:
+            self.active.discard(job_id)
+
+    async def get(self, job_id: str) -> Optional[VectorizationStatus]:
+        """Return the job status, or None if unknown"""
+        return self.jobs.get(job_id)
+
+    async def get_batch(self, batch_id: str) -> List[VectorizationStatus]:
+        """Return all jobs belonging to a batch"""
+        return [self.jobs[job_id] for job_id in self.batches.get(batch_id, [])]
+
+    async def active_count(self) -> int:
+        """Number of jobs currently processing"""
+        return len(self.active)
+
+    async def get_result(self, cache_key: str) -> Optional[str]:
+        """Output file of an earlier job for the same image and quality"""
+        cached = self.results.get(cache_key)
+        if cached is None or time.monotonic() - cached[1] >= RESULT_TTL_SECONDS:
+            return None
+        return cached[0]
+
+    async def set_result(self, cache_key: str, output_file: str) -> None:
+        """Remember a finished job's output for identical uploads"""
+        now = time.monotonic()
+        # Drop expired entries (oldest first) before adding the newest
+        while self.results:
+            key = next(iter(self.results))
+            if now - self.results[key][1] < RESULT_TTL_SECONDS:
+                break
+            del self.results[key]
+        self.results.pop(cache_key, None)
+        self.results[cache_key] = (output_file, now)
+
+    async def close(self) -> None:
+        """Nothing to release for the in-memory store"""
+
+
+class RedisJobStore:
+    """
+    Redis-backed job store shared across API workers.
+
+    Layout:
+        job:{job_id}      HASH  VectorizationStatus fields (None fields omitted)
+        batch:{batch_id}  LIST  job_ids in upload order
+        active_job_starts ZSET  job_ids currently processing, scored by start
+                                time (entries older than JOB_TTL_SECONDS are
+                                pruned, so a crashed worker's jobs age out)
+        result:{key}      STRING  output file for "{sha256}:{quality}"
+    """
+
+    def __init__(self, url: str):
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    async def create(self, status: VectorizationStatus,
+                     batch_id: Optional[str] = None) -> None:
+        """Register a new job (optionally as part of a batch)"""
+        key = self._key(status.job_id)
+        if batch_id:
+            status.batch_id = batch_id
+        mapping = status.model_dump(exclude_none=True)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, JOB_TTL_SECONDS)
+            if batch_id:
+                pipe.rpush(f"batch:{batch_id}", status.job_id)
+                pipe.expire(f"batch:{batch_id}", JOB_TTL_SECONDS)
+            await pipe.execute()
+
+    async def update(self, job_id: str, **fields) -> None:
+        """Set one or more status fields on an existing job"""
+        key = self._key(job_id)
+        mapping = {name: value for name, value in fields.items() if value is not None}
+        cleared = [name for name, value in fields.items() if value is None]
+
+        async def apply(pipe) -> None:
+            # HSET on an expired job would recreate a partial hash with no
+            # TTL, so only write while the key exists (WATCH aborts the
+            # transaction if it expires in between, and transaction() retries)
+            if not await pipe.exists(key):
+                return
+            pipe.multi()
+            if mapping:
+                pipe.hset(key, mapping=mapping)
+            if cleared:
+                pipe.hdel(key, *cleared)
+            # Keep the active set in step with the status field
+            if fields.get("status") == "processing":
+                pipe.zadd("active_job_starts", {job_id: time.time()})
+            elif "status" in fields:
+                pipe.zrem("active_job_starts", job_id)
+
+        await self.redis.transaction(apply, key)
+
+    async def get(self, job_id: str) -> Optional[VectorizationStatus]:
+        """Return the job status, or None if unknown/expired"""
+        data = await self.redis.hgetall(self._key(job_id))
+        return VectorizationStatus(**data) if data else None
+
+    async def get_batch(self, batch_id: str) -> List[VectorizationStatus]:
+        """Return all jobs belonging to a batch in upload order (one pipelined round-trip)"""
+        job_ids = await self.redis.lrange(f"batch:{batch_id}", 0, -1)
+        if not job_ids:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall(self._key(job_id))
+            results = await pipe.execute()
+
+        return [VectorizationStatus(**data) for data in results if data]
+
+    async def active_count(self) -> int:
+        """Number of jobs currently processing"""
+        # A job whose worker died never leaves the set; drop it after the TTL
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore("active_job_starts", "-inf", time.time() - JOB_TTL_SECONDS)
+            pipe.zcard("active_job_starts")
+            _, count = await pipe.execute()
+        return count
+
+    async def get_result(self, cache_key: str) -> Optional[str]:
+        """Output file of an earlier job for the same image and quality"""
+        return await self.redis.get(f"result:{cache_key}")
+
+    async def set_result(self, cache_key: str, output_file: str) -> None:
+        """Remember a finished job's output for identical uploads"""
+        await self.redis.set(f"result:{cache_key}", output_file, ex=RESULT_TTL_SECONDS)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool"""
+        await self.redis.aclose()
+
+
+def create_job_store():
+    """Pick the Redis store when REDIS_URL is set and redis-py is installed"""
+    url = os.getenv("REDIS_URL")
+    if url and REDIS_AVAILABLE:
+        logger.info(f"[JOBS] Using Redis job store: {url}")
+        return RedisJobStore(url)
+    if url:
+        logger.warning("[JOBS] REDIS_URL set but redis package missing - using in-memory store")
+    return InMemoryJobStore()
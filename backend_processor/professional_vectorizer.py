@@ -10,7 +10,10 @@ import cv2
 import numpy as np
 from PIL import Image
 import io
-from typing import List, Tuple, Dict
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Mapping, Optional, TextIO, Union
 from skimage import morphology, measure
 from scipy import interpolate
 import math
@@ -31,6 +34,71 @@ except ImportError:
     PREMIUM_FEATURES = False
     print("[VECTORIZER] Python mode (slower)")
 
+# OpenCV T-API: run preprocessing on cv2.UMat when OpenCV found an OpenCL
+# device (opt out with OPENCV_OPENCL_DEVICE=disabled)
+OPENCL_AVAILABLE = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
+# K-means fallback tuning
+KMEANS_SAMPLE_SIZE = 20000  # Pixels used to fit the palette
+KMEANS_ATTEMPTS = 1  # k-means++ restarts; extra runs barely lower the error (<0.5%)
+ASSIGN_CHUNK_SIZE = 65536  # Rows per nearest-center distance block
+SVG_WRITE_BUFFER = 1 << 20  # Output file buffer; SVG elements are streamed into it
+HEX_BYTE = tuple('%02x' % i for i in range(256))  # Channel value -> two hex digits of a #rrggbb fill
+SMOOTH_BATCH_SIZE = 64  # Contours per B-spline smoothing task
+MORPH_MARGIN = 4  # Padding around a layer's bounding box for mask cleanup (> close reach of 2)
+BEZIER_TEMPLATE = "C %r %r, %r %r, %d %d"  # Control points print like str(float)
+GRADIENT_TEMPLATE = """
+        <linearGradient id="grad%d" x1="0%%" y1="0%%" x2="0%%" y2="100%%">
+            <stop offset="0%%" style="stop-color:rgb(%d,%d,%d);stop-opacity:1" />
+            <stop offset="100%%" style="stop-color:rgb(%d,%d,%d);stop-opacity:1" />
+        </linearGradient>"""  # %d truncates the mean colors like int()
+
+def _stage_threads() -> int:
+    """
+    Thread pool size for the per-layer / per-contour stages.
+    
+    Follows OpenCV's thread budget for this process: WORKER_THREADS in API
+    pool workers (set by init_worker), all cores when run standalone. Using
+    os.cpu_count() here would start cores x MAX_CONCURRENT_JOBS threads.
+    """
+    return max(1, cv2.getNumThreads())
+
+# Quality presets (read-only, shared by every job)
+QUALITY_SETTINGS = MappingProxyType({
+    'fast': MappingProxyType({
+        'colors': 16,
+        'blur': 1,
+        'epsilon_factor': 0.01,
+        'min_area': 100,
+        'gradient_detection': False,
+        'curve_smoothing': 0.3
+    }),
+    'balanced': MappingProxyType({
+        'colors': 32,
+        'blur': 2,
+        'epsilon_factor': 0.008,
+        'min_area': 50,
+        'gradient_detection': True,
+        'curve_smoothing': 0.5
+    }),
+    'high': MappingProxyType({
+        'colors': 64,
+        'blur': 2,
+        'epsilon_factor': 0.005,
+        'min_area': 25,
+        'gradient_detection': True,
+        'curve_smoothing': 0.7
+    }),
+    'ultra': MappingProxyType({
+        'colors': 128,
+        'blur': 3,
+        'epsilon_factor': 0.003,
+        'min_area': 10,
+        'gradient_detection': True,
+        'curve_smoothing': 0.9
+    })
+})
+
 
 class ProfessionalVectorizer:
     """
@@ -42,20 +110,32 @@ class ProfessionalVectorizer:
     - Topology preservation
     """
     
-    def __init__(self, image_path: str):
-        self.image_path = image_path
-        self.original = cv2.imread(image_path)
+    def __init__(self, image_path: Union[str, bytes]):
+        """image_path: file path, or the encoded image bytes (small uploads skip the disk)"""
+        if isinstance(image_path, bytes):
+            self.image_path = None
+            self.original = cv2.imdecode(np.frombuffer(image_path, np.uint8), cv2.IMREAD_COLOR)
+            source = io.BytesIO(image_path)
+        else:
+            self.image_path = image_path
+            self.original = cv2.imread(image_path)
+            source = image_path
         if self.original is None:
             # Try with PIL if OpenCV fails
-            pil_img = Image.open(image_path).convert('RGB')
-            self.original = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+            pil_img = Image.open(source).convert('RGB')
+            self.original = cv2.cvtColor(np.asarray(pil_img), cv2.COLOR_RGB2BGR)
         
         self.height, self.width = self.original.shape[:2]
+        # Per-pixel palette index and RGB palette from the last quantization
+        # (only the OpenCV k-means path produces them)
+        self._labels: Optional[np.ndarray] = None
+        self._palette: Optional[np.ndarray] = None
         print(f"[VECTORIZER] Loaded {self.width}x{self.height} image")
     
     def vectorize(self, output_path: str, quality: str = 'high') -> str:
         """
         Professional vectorization pipeline
+        Returns output_path (the SVG is streamed to disk, not kept in memory)
         """
         print(f"\n{'='*70}")
         print(f"PROFESSIONAL VECTORIZATION - {quality.upper()} QUALITY")
@@ -65,88 +145,60 @@ class ProfessionalVectorizer:
         
         # Step 1: Preprocessing
         print("[STEP 1/7] Preprocessing image...")
-        preprocessed = self._preprocess_image(settings)
-        
-        # Step 2: Color quantization with LAB
-        print(f"[STEP 2/7] Color quantization to {settings['colors']} colors...")
-        quantized = self._quantize_colors_advanced(preprocessed, settings)
-        
-        # Step 3: Extract color layers with proper separation
-        print("[STEP 3/7] Extracting color layers...")
-        color_layers = self._extract_color_layers(quantized, settings)
-        
-        # Step 4: Detect contours with hierarchy
-        print("[STEP 4/7] Detecting contours (OpenCV)...")
-        contours_data = self._detect_contours_opencv(color_layers, settings)
-        
-        # Step 5: Optimize and smooth paths
-        print("[STEP 5/7] Smoothing paths (B-spline)...")
-        smooth_contours = self._smooth_contours(contours_data, settings)
-        
-        # Step 6: Detect gradients
-        print("[STEP 6/7] Analyzing gradients...")
-        gradients = self._detect_gradients(preprocessed, color_layers)
+        preprocessed, preprocessed_lab, lightness = self._preprocess_image(settings)
+        
+        # Gradient analysis only needs the preprocessed frames, so it runs on
+        # its own thread alongside steps 2-5 (OpenCV releases the GIL).
+        # Presets with gradient_detection off skip it entirely
+        with ThreadPoolExecutor(max_workers=1) as gradient_executor:
+            gradients_future = None
+            if settings['gradient_detection']:
+                gradients_future = gradient_executor.submit(self._detect_gradients,
+                                                            preprocessed, lightness)
+            
+            # Step 2: Color quantization with LAB
+            print(f"[STEP 2/7] Color quantization to {settings['colors']} colors...")
+            quantized = self._quantize_colors_advanced(preprocessed, preprocessed_lab, settings)
+            
+            # Step 3: Extract color layers with proper separation
+            print("[STEP 3/7] Extracting color layers...")
+            color_layers = self._extract_color_layers(quantized, settings)
+            
+            # Step 4: Detect contours with hierarchy
+            print("[STEP 4/7] Detecting contours (OpenCV)...")
+            contours_data = self._detect_contours_opencv(color_layers, settings)
+            
+            # Step 5: Optimize and smooth paths
+            print("[STEP 5/7] Smoothing paths (B-spline)...")
+            smooth_contours = self._smooth_contours(contours_data, settings)
+            
+            # Step 6: Detect gradients (started after step 1)
+            print("[STEP 6/7] Analyzing gradients...")
+            gradients = gradients_future.result() if gradients_future is not None else []
         
-        # Step 7: Generate SVG
+        # Step 7: Generate SVG, streamed straight into the output file so the
+        # whole document is never assembled in memory
         print("[STEP 7/7] Generating SVG...")
-        svg_content = self._generate_professional_svg(
-            smooth_contours, gradients, settings
-        )
-        
-        # Save
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(svg_content)
+        with open(output_path, 'w', encoding='utf-8', buffering=SVG_WRITE_BUFFER) as f:
+            self._generate_professional_svg(f, smooth_contours, gradients, settings)
         
-        import os
         file_size = os.path.getsize(output_path)
         print(f"\n[SUCCESS] Professional SVG created!")
         print(f"[OUTPUT] {output_path}")
         print(f"[SIZE] {file_size:,} bytes")
         print(f"[LAYERS] {len(smooth_contours)} shapes")
         
-        return svg_content
+        return output_path
     
-    def _get_quality_settings(self, quality: str) -> Dict:
+    def _get_quality_settings(self, quality: str) -> Mapping:
         """Quality presets"""
-        settings = {
-            'fast': {
-                'colors': 16,
-                'blur': 1,
-                'epsilon_factor': 0.01,
-                'min_area': 100,
-                'gradient_detection': False,
-                'curve_smoothing': 0.3
-            },
-            'balanced': {
-                'colors': 32,
-                'blur': 2,
-                'epsilon_factor': 0.008,
-                'min_area': 50,
-                'gradient_detection': True,
-                'curve_smoothing': 0.5
-            },
-            'high': {
-                'colors': 64,
-                'blur': 2,
-                'epsilon_factor': 0.005,
-                'min_area': 25,
-                'gradient_detection': True,
-                'curve_smoothing': 0.7
-            },
-            'ultra': {
-                'colors': 128,
-                'blur': 3,
-                'epsilon_factor': 0.003,
-                'min_area': 10,
-                'gradient_detection': True,
-                'curve_smoothing': 0.9
-            }
-        }
-        return settings.get(quality, settings['high'])
+        return QUALITY_SETTINGS.get(quality, QUALITY_SETTINGS['high'])
     
-    def _preprocess_image(self, settings: Dict) -> np.ndarray:
-        """Advanced preprocessing"""
-        img = self.original.copy()
+    def _preprocess_image(self, settings: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Advanced preprocessing; returns the result as BGR, as LAB and its L channel"""
+        # On an OpenCL device the whole filter chain stays in device memory
+        # (T-API); the result is downloaded once at the end
+        img = cv2.UMat(self.original) if OPENCL_AVAILABLE else self.original.copy()
         
         # Bilateral filter (edge-preserving smoothing)
         img = cv2.bilateralFilter(img, d=9, sigmaColor=75, sigmaSpace=75)
@@ -161,130 +213,221 @@ class ProfessionalVectorizer:
         l, a, b = cv2.split(lab)
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         l = clahe.apply(l)
-        img = cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
-        
-        return img
+        lab = cv2.merge([l, a, b])
+        img = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        
+        # LAB is kept so k-means does not convert the BGR result straight
+        # back, and L so gradient analysis needs no grayscale pass
+        if OPENCL_AVAILABLE:
+            return img.get(), lab.get(), l.get()
+        return img, lab, l
     
-    def _quantize_colors_advanced(self, image: np.ndarray, settings: Dict) -> np.ndarray:
-        """Advanced color quantization using LAB color space"""
+    def _quantize_colors_advanced(self, image: np.ndarray, lab_image: np.ndarray,
+                                  settings: Dict) -> np.ndarray:
+        """Advanced color quantization using LAB color space (image as BGR and LAB)"""
         num_colors = settings['colors']
+        self._labels = self._palette = None
         
         if RUST_AVAILABLE:
-            # Use Rust LAB k-means (40% better perceptual quality)
-            pil_img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-            buf = io.BytesIO()
-            pil_img.save(buf, format='PNG')
-            img_bytes = list(buf.getvalue())
+            # Use Rust LAB k-means (40% better perceptual quality) on the raw
+            # RGB buffer - no PNG encode/decode on either side
+            height, width = image.shape[:2]
+            rgb_bytes = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).tobytes()
             
             if PREMIUM_FEATURES:
                 try:
-                    result_bytes = rust_core.quantize_colors_lab(img_bytes, num_colors, 15)
+                    result = rust_core.quantize_colors_lab_raw(rgb_bytes, width, height,
+                                                               num_colors, 15)
                     print("   ✨ Using LAB k-means (perceptually optimized)")
-                    result_img = Image.open(io.BytesIO(bytes(result_bytes)))
-                    return cv2.cvtColor(np.array(result_img), cv2.COLOR_RGB2BGR)
+                    rgb = np.frombuffer(result, dtype=np.uint8).reshape(height, width, 3)
+                    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
                 except Exception as e:
                     print(f"   ⚠️ LAB k-means fallback: {e}")
             
             # RGB k-means fallback
             try:
-                result_bytes = rust_core.quantize_colors(img_bytes, num_colors, 15)
-                result_img = Image.open(io.BytesIO(bytes(result_bytes)))
-                return cv2.cvtColor(np.array(result_img), cv2.COLOR_RGB2BGR)
+                result = rust_core.quantize_colors_raw(rgb_bytes, width, height, num_colors, 15)
+                rgb = np.frombuffer(result, dtype=np.uint8).reshape(height, width, 3)
+                return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
             except:
                 pass
         
         # Python fallback - K-means in LAB space
         print("   Using OpenCV k-means (LAB color space)")
-        lab_image = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        pixels = lab_image.reshape(-1, 3).astype(np.float32)
+        pixels = lab_image.reshape(-1, 3)
+        
+        # Fit the palette on a strided sample, then assign every pixel
+        # (pixels stay uint8; only the sample and each block become float32)
+        step = max(1, len(pixels) // KMEANS_SAMPLE_SIZE)
+        sample = pixels[::step].astype(np.float32)
+        k = min(num_colors, len(sample))
         
         criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
-        _, labels, centers = cv2.kmeans(pixels, num_colors, None, criteria, 10, 
-                                         cv2.KMEANS_PP_CENTERS)
+        _, _, centers = cv2.kmeans(sample, k, None, criteria, KMEANS_ATTEMPTS,
+                                   cv2.KMEANS_PP_CENTERS)
+        labels = self._assign_to_centers(pixels, centers)
         
+        # Convert the k palette entries (not every pixel) back to BGR
         centers = centers.astype(np.uint8)
-        quantized_lab = centers[labels.flatten()].reshape(lab_image.shape)
-        quantized = cv2.cvtColor(quantized_lab, cv2.COLOR_LAB2BGR)
+        palette_bgr = cv2.cvtColor(centers.reshape(-1, 1, 3), cv2.COLOR_LAB2BGR).reshape(-1, 3)
+        quantized = palette_bgr[labels].reshape(lab_image.shape)
+        
+        # Keep the label map so layer extraction can skip re-deriving colors
+        self._labels = labels.reshape(lab_image.shape[:2])
+        self._palette = palette_bgr[:, ::-1]
         
         return quantized
     
+    def _assign_to_centers(self, pixels: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Nearest-center labels via ||c||^2 - 2x.c (chunked; uint8 pixels cast per chunk)"""
+        center_norms = np.einsum('ij,ij->i', centers, centers)
+        labels = np.empty(len(pixels), dtype=np.int32)
+        
+        for start in range(0, len(pixels), ASSIGN_CHUNK_SIZE):
+            chunk = pixels[start:start + ASSIGN_CHUNK_SIZE].astype(np.float32)
+            labels[start:start + len(chunk)] = np.argmin(
+                center_norms - 2.0 * (chunk @ centers.T), axis=1
+            )
+        
+        return labels
+    
     def _extract_color_layers(self, image: np.ndarray, settings: Dict) -> Dict:
         """Extract clean color layers"""
         color_layers = {}
         
-        # Convert to RGB for easier color comparison
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Get unique colors
-        pixels = rgb.reshape(-1, 3)
-        unique_colors = np.unique(pixels, axis=0, return_counts=True)
-        colors, counts = unique_colors
-        
-        # Sort by frequency
-        sorted_indices = np.argsort(-counts)
+        if self._labels is not None:
+            # The quantizer's label map already says which palette entry each
+            # pixel took: count per label and compare 1-byte labels per layer.
+            # Palette entries that convert to the same RGB share one layer.
+            colors, inverse = np.unique(self._pack_rgb(self._palette), return_inverse=True)
+            layer_ids = np.arange(len(colors))
+            index_map = inverse.astype(np.min_scalar_type(len(colors)))[self._labels]
+            counts = np.bincount(index_map.ravel(), minlength=len(colors))
+        else:
+            # Pack each pixel into one int32 (0xRRGGBB) so colors compare as scalars
+            index_map = self._pack_rgb(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            colors, counts = np.unique(index_map, return_counts=True)
+            layer_ids = colors
+        
+        # Sort by frequency (ties keep color order)
+        sorted_indices = np.argsort(-counts, kind='stable')
         colors = colors[sorted_indices]
         counts = counts[sorted_indices]
+        layer_ids = layer_ids[sorted_indices]
         
         print(f"   Found {len(colors)} unique colors")
         
-        for i, (color, count) in enumerate(zip(colors, counts)):
-            if count < settings['min_area']:
-                continue
-            
-            # Create binary mask for this color
-            mask = cv2.inRange(rgb, color, color)
-            
-            # Morphological operations to clean up
-            kernel = np.ones((3, 3), np.uint8)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-            
-            color_tuple = tuple(color.tolist())
-            color_layers[color_tuple] = mask
+        kept = [(int(color), int(layer_id)) for color, layer_id, count
+                in zip(colors, layer_ids, counts) if count >= settings['min_area']]
+        
+        # Layers are independent, so masks are cleaned up concurrently
+        # (OpenCV releases the GIL)
+        with ThreadPoolExecutor(max_workers=_stage_threads()) as executor:
+            masks = executor.map(self._clean_layer_mask, [index_map] * len(kept),
+                                 [layer_id for _, layer_id in kept])
+            for (color, _), mask in zip(kept, masks):
+                color_tuple = (color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+                color_layers[color_tuple] = mask
         
         print(f"   Extracted {len(color_layers)} color layers")
         return color_layers
     
+    @staticmethod
+    def _pack_rgb(rgb: np.ndarray) -> np.ndarray:
+        """Pack (..., 3) uint8 RGB into int32 0xRRGGBB keys"""
+        return ((rgb[..., 0].astype(np.int32) << 16)
+                | (rgb[..., 1].astype(np.int32) << 8)
+                | rgb[..., 2])
+    
+    def _clean_layer_mask(self, index_map: np.ndarray, layer_id: int) -> np.ndarray:
+        """Binary mask for one layer id (label or packed color), closed then opened to drop speckle"""
+        # Create binary mask for this layer (one scalar compare per pixel)
+        mask = cv2.compare(index_map, layer_id, cv2.CMP_EQ)
+        
+        # Close/open cannot grow a layer past its bounding box, so only that
+        # box (plus a margin wider than the kernels reach) is processed
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0:
+            return mask
+        top, left = max(y - MORPH_MARGIN, 0), max(x - MORPH_MARGIN, 0)
+        roi = mask[top:y + h + MORPH_MARGIN, left:x + w + MORPH_MARGIN]
+        
+        # Morphological operations to clean up
+        kernel = np.ones((3, 3), np.uint8)
+        roi[:] = cv2.morphologyEx(roi, cv2.MORPH_CLOSE, kernel, iterations=2)
+        roi[:] = cv2.morphologyEx(roi, cv2.MORPH_OPEN, kernel, iterations=1)
+        return mask
+    
     def _detect_contours_opencv(self, color_layers: Dict, settings: Dict) -> List[Dict]:
         """Professional contour detection with OpenCV"""
         all_contours = []
         
-        for color, mask in color_layers.items():
-            # Find contours with hierarchy
-            contours, hierarchy = cv2.findContours(
-                mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
-            )
-            
-            if contours is None or len(contours) == 0:
-                continue
-            
-            for i, contour in enumerate(contours):
-                area = cv2.contourArea(contour)
-                if area < settings['min_area']:
-                    continue
-                
-                # Check if it's a hole or external contour
-                is_hole = False
-                if hierarchy is not None and hierarchy[0][i][3] != -1:
-                    is_hole = True
-                
-                all_contours.append({
-                    'contour': contour,
-                    'color': color,
-                    'area': area,
-                    'is_hole': is_hole
-                })
+        # Each layer's contours are found concurrently
+        min_area = [settings['min_area']] * len(color_layers)
+        with ThreadPoolExecutor(max_workers=_stage_threads()) as executor:
+            for layer_contours in executor.map(self._layer_contours, color_layers.keys(),
+                                               color_layers.values(), min_area):
+                all_contours.extend(layer_contours)
         
-        # Sort by area (largest first) for proper layering
-        all_contours.sort(key=lambda x: x['area'], reverse=True)
+        # Sort by area (largest first) for proper layering: one stable
+        # argsort over an area array rather than a key call per contour
+        areas = np.array([data['area'] for data in all_contours])
+        all_contours = [all_contours[i] for i in np.argsort(-areas, kind='stable')]
         
         print(f"   Detected {len(all_contours)} contours")
         return all_contours
     
+    def _layer_contours(self, color: Tuple, mask: np.ndarray, min_area: int) -> List[Dict]:
+        """Contours of one color layer, with hole flags from the hierarchy"""
+        layer_contours = []
+
+        # Trace only the layer's bounding box; the offset maps points back
+        # to image coordinates
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0:
+            return layer_contours
+
+        # Find contours with hierarchy
+        contours, hierarchy = cv2.findContours(
+            mask[y:y + h, x:x + w], cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE,
+            offset=(x, y)
+        )
+        
+        # The box holds at least one set pixel, so there is always a contour
+        # and a hierarchy; a contour with a parent is a hole
+        parents = hierarchy[0][:, 3].tolist()
+        
+        for contour, parent in zip(contours, parents):
+            area = cv2.contourArea(contour)
+            if area < min_area:
+                continue
+            
+            layer_contours.append({
+                'contour': contour,
+                'color': color,
+                'area': area,
+                'is_hole': parent != -1
+            })
+        
+        return layer_contours
+    
     def _smooth_contours(self, contours_data: List[Dict], settings: Dict) -> List[Dict]:
         """Smooth contours using advanced curve fitting"""
+        # Contours are independent, so batches of them are smoothed
+        # concurrently (batched to amortize per-task overhead; map keeps
+        # the largest-first order)
+        batches = [contours_data[i:i + SMOOTH_BATCH_SIZE]
+                   for i in range(0, len(contours_data), SMOOTH_BATCH_SIZE)]
         smoothed = []
+        with ThreadPoolExecutor(max_workers=_stage_threads()) as executor:
+            for batch in executor.map(self._smooth_batch, batches,
+                                      [settings] * len(batches)):
+                smoothed.extend(batch)
         
+        return smoothed
+    
+    def _smooth_batch(self, contours_data: List[Dict], settings: Dict) -> List[Dict]:
+        """Simplify then B-spline smooth each contour of one batch"""
         for data in contours_data:
             contour = data['contour']
             
@@ -292,19 +435,13 @@ class ProfessionalVectorizer:
             epsilon = settings['epsilon_factor'] * cv2.arcLength(contour, True)
             approx = cv2.approxPolyDP(contour, epsilon, True)
             
-            # Apply B-spline smoothing if enough points
+            # Apply B-spline smoothing if enough points (falls back to approx itself)
             if len(approx) > 4 and settings['curve_smoothing'] > 0.5:
-                try:
-                    smoothed_points = self._apply_bspline_smoothing(approx)
-                    data['smooth_contour'] = smoothed_points
-                except:
-                    data['smooth_contour'] = approx
+                data['smooth_contour'] = self._apply_bspline_smoothing(approx)
             else:
                 data['smooth_contour'] = approx
-            
-            smoothed.append(data)
         
-        return smoothed
+        return contours_data
     
     def _apply_bspline_smoothing(self, contour: np.ndarray) -> np.ndarray:
         """Apply B-spline smoothing to contour"""
@@ -316,10 +453,6 @@ class ProfessionalVectorizer:
         # Close the curve
         points = np.vstack([points, points[0]])
         
-        # Parameterize by cumulative distance
-        distances = np.sqrt(np.sum(np.diff(points, axis=0)**2, axis=1))
-        distances = np.concatenate(([0], np.cumsum(distances)))
-        
         # Fit B-spline
         try:
             tck, u = interpolate.splprep([points[:, 0], points[:, 1]], s=2, k=3, per=True)
@@ -328,24 +461,26 @@ class ProfessionalVectorizer:
             
             result = np.column_stack(smooth_points).astype(np.int32)
             return result.reshape(-1, 1, 2)
-        except:
+        except (ValueError, TypeError):
+            # FITPACK rejects degenerate input (e.g. repeated points)
             return contour
     
-    def _detect_gradients(self, image: np.ndarray, color_layers: Dict) -> List[Dict]:
-        """Detect smooth color gradients"""
+    def _detect_gradients(self, image: np.ndarray, lightness: np.ndarray) -> List[Dict]:
+        """Detect smooth color gradients (image as BGR, lightness as its LAB L channel)"""
         gradients = []
         
-        # Convert to grayscale for gradient analysis
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Calculate gradient magnitude
-        grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=5)
-        grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=5)
-        magnitude = np.sqrt(grad_x**2 + grad_y**2)
+        # Calculate gradient magnitude on perceptual lightness (preprocessing's
+        # CLAHE-enhanced L channel, so no separate grayscale pass). float32:
+        # the 5x5 Sobel of 8-bit input is an exact integer, and half the
+        # bytes of CV_64F per pass
+        grad_x = cv2.Sobel(lightness, cv2.CV_32F, 1, 0, ksize=5)
+        grad_y = cv2.Sobel(lightness, cv2.CV_32F, 0, 1, ksize=5)
+        magnitude = cv2.magnitude(grad_x, grad_y)
         
-        # Threshold for significant gradients
+        # Threshold for significant gradients (findContours only needs
+        # nonzero, so the bool result is reinterpreted as 0/1 bytes in place)
         threshold = np.percentile(magnitude, 75)
-        gradient_mask = (magnitude > threshold).astype(np.uint8) * 255
+        gradient_mask = (magnitude > threshold).view(np.uint8)
         
         # Find gradient regions
         contours, _ = cv2.findContours(gradient_mask, cv2.RETR_EXTERNAL, 
@@ -370,13 +505,13 @@ class ProfessionalVectorizer:
         
         return gradients
     
-    def _generate_professional_svg(self, contours_data: List[Dict], 
-                                    gradients: List[Dict], settings: Dict) -> str:
-        """Generate professional SVG with gradients and smooth paths"""
-        svg_parts = []
+    def _generate_professional_svg(self, fh: TextIO, contours_data: List[Dict], 
+                                    gradients: List[Dict], settings: Dict) -> None:
+        """Write professional SVG with gradients and smooth paths to fh"""
+        write = fh.write
         
         # SVG header
-        svg_parts.append(f'''<?xml version="1.0" encoding="UTF-8"?>
+        write(f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" 
      xmlns:xlink="http://www.w3.org/1999/xlink"
      width="{self.width}" 
@@ -390,21 +525,17 @@ class ProfessionalVectorizer:
 ''')
         
         # Add gradient definitions
-        for i, grad in enumerate(gradients):
-            r1, g1, b1 = grad['start_color']
-            r2, g2, b2 = grad['end_color']
-            svg_parts.append(f'''
-        <linearGradient id="grad{i}" x1="0%" y1="0%" x2="0%" y2="100%">
-            <stop offset="0%" style="stop-color:rgb({int(r1)},{int(g1)},{int(b1)});stop-opacity:1" />
-            <stop offset="100%" style="stop-color:rgb({int(r2)},{int(g2)},{int(b2)});stop-opacity:1" />
-        </linearGradient>''')
+        write("".join([GRADIENT_TEMPLATE % (i, *grad['start_color'], *grad['end_color'])
+                       for i, grad in enumerate(gradients)]))
         
-        svg_parts.append('    </defs>\n\n')
+        write('    </defs>\n\n')
         
         # White background
-        svg_parts.append('    <rect width="100%" height="100%" fill="white"/>\n\n')
+        write('    <rect width="100%" height="100%" fill="white"/>\n\n')
         
-        # Add contour paths
+        # Add contour paths; the group carries the attributes shared by every
+        # shape, so only holes restate opacity and fill rule
+        write('    <g stroke="none" fill-opacity="0.95">\n')
         for i, data in enumerate(contours_data):
             contour = data['smooth_contour']
             color = data['color']
@@ -417,19 +548,12 @@ class ProfessionalVectorizer:
             path_data = self._contour_to_svg_path(contour)
             
             r, g, b = color
-            fill_rule = "evenodd" if is_hole else "nonzero"
-            opacity = 0.95 if not is_hole else 1.0
+            hole_attrs = ' fill-opacity="1.0" fill-rule="evenodd"' if is_hole else ''
             
-            svg_parts.append(f'''    <path d="{path_data}" 
-          fill="rgb({r},{g},{b})" 
-          fill-opacity="{opacity}"
-          fill-rule="{fill_rule}"
-          stroke="none"/>
+            write(f'''    <path d="{path_data}" fill="#{HEX_BYTE[r]}{HEX_BYTE[g]}{HEX_BYTE[b]}"{hole_attrs}/>
 ''')
         
-        svg_parts.append('</svg>')
-        
-        return ''.join(svg_parts)
+        write('    </g>\n</svg>')
     
     def _contour_to_svg_path(self, contour: np.ndarray) -> str:
         """Convert OpenCV contour to smooth SVG path with Bezier curves"""
@@ -438,36 +562,35 @@ class ProfessionalVectorizer:
         if len(points) < 2:
             return ""
         
-        path_parts = [f"M {points[0][0]} {points[0][1]}"]
-        
-        # Use cubic Bezier curves for smoothness
-        for i in range(1, len(points)):
-            x, y = points[i]
-            
-            if i < len(points) - 1:
-                # Calculate smooth control points
-                x_prev, y_prev = points[i-1]
-                x_next, y_next = points[i+1]
-                
-                # Control point 1 (from previous)
-                cx1 = x_prev + (x - x_prev) * 0.5
-                cy1 = y_prev + (y - y_prev) * 0.5
-                
-                # Control point 2 (to next)
-                cx2 = x + (x_next - x) * 0.5
-                cy2 = y + (y_next - y) * 0.5
-                
-                path_parts.append(f"C {cx1} {cy1}, {cx2} {cy2}, {x} {y}")
-            else:
-                path_parts.append(f"L {x} {y}")
+        # Smooth control points for every interior vertex at once: halfway
+        # from the previous vertex, and halfway towards the next one
+        prev, cur, nxt = points[:-2], points[1:-1], points[2:]
+        controls = np.hstack([prev + (cur - prev) * 0.5, cur + (nxt - cur) * 0.5])
+
+        # A vertex in line with both neighbours takes a plain line: its cubic
+        # would never leave that line (vertices are integers, so |cross| < 1
+        # means exactly collinear). One that also continues in the same
+        # direction into another line segment is dropped altogether.
+        d_in, d_out = cur - prev, nxt - cur
+        straight = np.abs(d_in[:, 0] * d_out[:, 1] - d_in[:, 1] * d_out[:, 0]) < 1
+        forward = np.einsum('ij,ij->i', d_in, d_out) > 0
+        keep = ~(straight & forward & np.append(straight[1:], True))
+
+        # Use cubic Bezier curves for smoothness, a line to the last vertex
+        path_parts = ["M %d %d" % tuple(points[0])]
+        path_parts.extend(["L %d %d" % tuple(end) if line else BEZIER_TEMPLATE % (*ctrl, *end)
+                           for ctrl, end, line in zip(controls[keep].tolist(), cur[keep].tolist(),
+                                                      straight[keep].tolist())])
+        path_parts.append("L %d %d" % tuple(points[-1]))
         
         path_parts.append("Z")
         return " ".join(path_parts)
 
-
-def vectorize_professional(input_path: str, output_path: str, quality: str = 'high') -> str:
+def vectorize_professional(input_path: Union[str, bytes], output_path: str,
+                           quality: str = 'high') -> str:
     """
     Main entry point for professional vectorization
+    Returns the path of the written SVG
     """
     vectorizer = ProfessionalVectorizer(input_path)
     return vectorizer.vectorize(output_path, quality)
@@ -31,10 +31,10 @@ class SemanticVectorizer(IntelligentVectorizer):
         
         # Use intelligent vectorization from parent
         print("[SEMANTIC] Using AI-enhanced vectorization...")
-        svg_content = self.create_high_quality_svg(output_path, 'high')
+        svg_path = self.create_high_quality_svg(output_path, 'high')
         
         print(f"\n[SUCCESS] Semantic SVG with {num_layers} layers!")
-        return svg_content
+        return svg_path
 
 
 def vectorize_semantic(input_path: str, output_path: str, num_layers: int = 3) -> str:
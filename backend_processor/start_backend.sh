@@ -12,7 +12,7 @@ echo ""
 # Check if Python 3 is installed
 if ! command -v python3 &> /dev/null; then
     echo "❌ ERROR: Python 3 is not installed"
-    echo "   Please install Python 3.8+ to continue"
+    echo "   Please install Python 3.10+ to continue"
     exit 1
 fi
 
@@ -6,13 +6,30 @@ Version: 1.0.0
 """
 
 import unittest
+import asyncio
+import hashlib
 import os
 import io
+import signal
+import struct
 import tempfile
+import zlib
+from pathlib import Path
+from unittest import mock
+import numpy as np
 from PIL import Image
+from scipy import ndimage
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
 
 # Import modules to test
-from intelligent_vectorizer import IntelligentVectorizer, vectorize_image
+import api_server
+from intelligent_vectorizer import (CORNER_CURVATURE, CORNER_SPAN, IntelligentVectorizer,
+                                    vectorize_image)
+from jit_kernels import (NUMBA_AVAILABLE, curvature_corners, douglas_peucker_mask,
+                         fit_cubic_beziers, trace_boundary)
+from job_store import JOB_TTL_SECONDS, RESULT_TTL_SECONDS, InMemoryJobStore, VectorizationStatus
 from semantic_vectorizer import SemanticVectorizer, vectorize_semantic
 
 try:
@@ -59,9 +76,12 @@ class TestIntelligentVectorizer(unittest.TestCase):
     def test_svg_generation_fast(self):
         """Test fast quality SVG generation"""
         output_path = os.path.join(self.test_dir, 'output_fast.svg')
-        svg_content = vectorize_image(self.test_image_path, output_path, 'fast')
+        svg_path = vectorize_image(self.test_image_path, output_path, 'fast')
         
+        self.assertEqual(svg_path, output_path)
         self.assertTrue(os.path.exists(output_path))
+        with open(output_path) as f:
+            svg_content = f.read()
         self.assertIn('<?xml version', svg_content)
         self.assertIn('<svg', svg_content)
         self.assertIn('</svg>', svg_content)
@@ -69,7 +89,7 @@ class TestIntelligentVectorizer(unittest.TestCase):
     def test_svg_generation_high(self):
         """Test high quality SVG generation"""
         output_path = os.path.join(self.test_dir, 'output_high.svg')
-        svg_content = vectorize_image(self.test_image_path, output_path, 'high')
+        vectorize_image(self.test_image_path, output_path, 'high')
         
         self.assertTrue(os.path.exists(output_path))
         file_size = os.path.getsize(output_path)
@@ -85,18 +105,263 @@ class TestIntelligentVectorizer(unittest.TestCase):
         # Should simplify collinear points
         self.assertLess(len(smoothed), len(points))
     
+    def test_bezier_fitting(self):
+        """Test cubic Bezier path generation"""
+        vectorizer = IntelligentVectorizer(self.test_image_path)
+        
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        path = vectorizer._create_smooth_path(square, tolerance=1.0)
+        
+        self.assertTrue(path.startswith('M 0 0'))
+        self.assertIn('C ', path)
+        self.assertTrue(path.endswith('Z'))
+    
     def test_boundary_extraction(self):
         """Test boundary point extraction"""
         vectorizer = IntelligentVectorizer(self.test_image_path)
         
         # Create simple region
-        pixels = [(x, y) for x in range(10) for y in range(10)]
-        boundary = vectorizer._extract_boundary(pixels)
+        mask = np.ones((10, 10), dtype=bool)
+        boundary = vectorizer._extract_boundary(mask)
         
         # Boundary should be smaller than full region
-        self.assertLess(len(boundary), len(pixels))
+        self.assertLess(len(boundary), mask.sum())
         self.assertGreater(len(boundary), 0)
 
+    def test_corner_detection(self):
+        """Test a 20x20 square keeps exactly its 4 corners and a disc has none"""
+        vectorizer = IntelligentVectorizer(self.test_image_path)
+        
+        square = np.zeros((30, 30), dtype=bool)
+        square[5:25, 5:25] = True
+        boundary = vectorizer._extract_boundary(square).astype(np.float64)
+        corners = curvature_corners(boundary, CORNER_SPAN, CORNER_CURVATURE)
+        self.assertEqual(sorted(map(tuple, boundary[corners].tolist())),
+                         [(5, 5), (5, 24), (24, 5), (24, 24)])
+        
+        yy, xx = np.mgrid[:50, :50]
+        disc = (xx - 25) ** 2 + (yy - 25) ** 2 <= 20 ** 2
+        boundary = vectorizer._extract_boundary(disc).astype(np.float64)
+        self.assertEqual(len(curvature_corners(boundary, CORNER_SPAN, CORNER_CURVATURE)), 0)
+    
+    def test_split_at_corners(self):
+        """Test corner runs cover the whole contour and close back at the start"""
+        vectorizer = IntelligentVectorizer(self.test_image_path)
+        
+        square = np.zeros((30, 30), dtype=bool)
+        square[5:25, 5:25] = True
+        yy, xx = np.mgrid[:50, :50]
+        disc = (xx - 25) ** 2 + (yy - 25) ** 2 <= 20 ** 2
+        
+        for name, mask, runs_expected in (('square', square, 4), ('disc', disc, 1)):
+            with self.subTest(shape=name):
+                boundary = vectorizer._extract_boundary(mask)
+                runs = vectorizer._split_at_corners(boundary)
+                self.assertEqual(len(runs), runs_expected)
+                
+                # Runs join end to start, and the last one returns to the first point
+                for run, next_run in zip(runs, runs[1:] + runs[:1]):
+                    np.testing.assert_array_equal(run[-1], next_run[0])
+                
+                # Together they visit every boundary point exactly once
+                visited = np.vstack([run[:-1] for run in runs])
+                self.assertEqual(len(visited), len(boundary))
+                self.assertEqual(set(map(tuple, visited.tolist())),
+                                 set(map(tuple, boundary.astype(np.float64).tolist())))
+    
+    def test_edge_fallback_matches_rust_sobel(self):
+        """Test the Python edge fallback reproduces the Rust Sobel kernel"""
+        import intelligent_vectorizer
+        
+        rng = np.random.default_rng(3)
+        pixels = rng.integers(0, 256, size=(300, 40, 3), dtype=np.uint8)  # Spans two strips
+        pixels[100:200, 10:30] = (20, 200, 90)
+        
+        # Rust: image::imageops::grayscale, 3x3 kernels, u8 magnitude, border untouched
+        gray = (pixels.astype(np.int64) @ np.array([2126, 7152, 722])) // 10000
+        gx = (gray[:-2, 2:] + 2 * gray[1:-1, 2:] + gray[2:, 2:]
+              - gray[:-2, :-2] - 2 * gray[1:-1, :-2] - gray[2:, :-2])
+        gy = (gray[2:, :-2] + 2 * gray[2:, 1:-1] + gray[2:, 2:]
+              - gray[:-2, :-2] - 2 * gray[:-2, 1:-1] - gray[:-2, 2:])
+        magnitude = np.minimum(np.sqrt((gx * gx + gy * gy).astype(np.float32)).astype(np.int64), 255)
+        
+        vectorizer = IntelligentVectorizer(self.test_image_path)
+        with mock.patch.object(intelligent_vectorizer, 'RUST_AVAILABLE', False):
+            for threshold in (0, 30, 100, 255):
+                expected = np.zeros(gray.shape, dtype=np.uint8)
+                expected[1:-1, 1:-1] = np.where(magnitude > threshold, 255, 0)
+                edges = vectorizer._detect_edges(Image.fromarray(pixels),
+                                                 {'edge_threshold': threshold})
+                np.testing.assert_array_equal(np.asarray(edges), expected)
+    
+    def test_component_splitting(self):
+        """Test disconnected blobs of one color are split apart"""
+        vectorizer = IntelligentVectorizer(self.test_image_path)
+
+        blob_a = [(x, y) for x in range(10) for y in range(10)]
+        blob_b = [(x + 50, y + 50) for x in range(10) for y in range(10)]
+        speck = [(80, 5)]
+        components = vectorizer._split_components(blob_a + blob_b + speck, 50)
+
+        # Two blobs kept, single-pixel speck dropped
+        self.assertEqual(len(components), 2)
+        self.assertEqual([int(mask.sum()) for mask, _ in components], [100, 100])
+        self.assertEqual([origin for _, origin in components], [(0, 0), (50, 50)])
+
+
+class TestJitKernels(unittest.TestCase):
+    """Test suite for the numba kernels against the Python versions they replaced"""
+    
+    @staticmethod
+    def _reference_douglas_peucker(points, epsilon):
+        """Recursive Douglas-Peucker the kernel replaced"""
+        if len(points) <= 2:
+            return points
+        
+        (x1, y1), (x2, y2) = points[0], points[-1]
+        line_length = np.hypot(x2 - x1, y2 - y1)
+        max_dist, max_index = 0, 0
+        for i in range(1, len(points) - 1):
+            x0, y0 = points[i]
+            if line_length == 0:
+                dist = np.hypot(x0 - x1, y0 - y1)
+            else:
+                dist = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1) / line_length
+            if dist > max_dist:
+                max_dist, max_index = dist, i
+        
+        if max_dist > epsilon:
+            left = TestJitKernels._reference_douglas_peucker(points[:max_index + 1], epsilon)
+            right = TestJitKernels._reference_douglas_peucker(points[max_index:], epsilon)
+            return left[:-1] + right
+        return [points[0], points[-1]]
+    
+    def test_douglas_peucker_matches_reference(self):
+        """Test the JIT Douglas-Peucker keeps the same points as the recursive one"""
+        # Compiled kernel, plus its plain-Python body (the no-numba fallback)
+        kernels = [douglas_peucker_mask]
+        if NUMBA_AVAILABLE:
+            kernels.append(douglas_peucker_mask.py_func)
+        
+        rng = np.random.default_rng(7)
+        for trial in range(50):
+            walk = np.cumsum(rng.integers(-3, 4, size=(int(rng.integers(3, 200)), 2)), axis=0)
+            if trial % 5 == 0:
+                walk = np.vstack([walk, walk[:1]])  # Closed polyline
+            points = [tuple(p) for p in walk.tolist()]
+            for epsilon in (0.5, 1.0, 2.5):
+                expected = self._reference_douglas_peucker(points, epsilon)
+                for kernel in kernels:
+                    keep = kernel(walk.astype(np.float64), epsilon)
+                    self.assertEqual([tuple(p) for p in walk[keep].tolist()], expected)
+    
+    def test_bezier_fit_circle(self):
+        """Test a sampled circle is fitted within tolerance by a chain of joined cubics"""
+        theta = np.linspace(0, 2 * np.pi, 201)
+        points = np.column_stack([50 + 30 * np.cos(theta), 50 + 30 * np.sin(theta)])
+        tolerance = 0.5
+        curves = fit_cubic_beziers(points, tolerance)
+        
+        self.assertGreater(len(curves), 1)
+        np.testing.assert_array_equal(curves[0, 0], points[0])
+        np.testing.assert_array_equal(curves[-1, 3], points[-1])
+        # Consecutive curves share their joint point
+        np.testing.assert_array_equal(curves[1:, 0], curves[:-1, 3])
+        
+        # Every input point lies within tolerance of the fitted curves
+        t = np.linspace(0, 1, 2000)[:, None]
+        samples = np.vstack([(1 - t) ** 3 * c[0] + 3 * (1 - t) ** 2 * t * c[1]
+                             + 3 * (1 - t) * t ** 2 * c[2] + t ** 3 * c[3] for c in curves])
+        distances = np.sqrt(((points[:, None] - samples[None]) ** 2).sum(axis=2)).min(axis=1)
+        self.assertLessEqual(distances.max(), tolerance)
+    
+    def test_trace_boundary_closed_contour(self):
+        """Test Moore tracing visits the same boundary pixels as the old ordering, in a closed walk"""
+        yy, xx = np.mgrid[:40, :50]
+        shapes = {
+            'disk': (xx - 25) ** 2 + (yy - 20) ** 2 <= 15 ** 2,
+            'rectangle': (xx >= 5) & (xx < 45) & (yy >= 10) & (yy < 30),
+            'l_shape': ((xx >= 5) & (xx < 15) & (yy >= 5) & (yy < 35)) |
+                       ((xx >= 5) & (xx < 40) & (yy >= 25) & (yy < 35)),
+        }
+        for name, region in shapes.items():
+            with self.subTest(shape=name):
+                eroded = ndimage.binary_erosion(region, structure=ndimage.generate_binary_structure(2, 1))
+                boundary = region & ~eroded
+                traced = trace_boundary(boundary)
+                
+                # Same point set the greedy nearest-neighbour ordering received
+                ys, xs = np.nonzero(boundary)
+                self.assertEqual(set(map(tuple, traced.tolist())), set(zip(xs.tolist(), ys.tolist())))
+                self.assertEqual(len(traced), len(xs))
+                
+                # Consecutive points (including last -> first) are 8-neighbours
+                steps = np.abs(np.diff(np.vstack([traced, traced[:1]]), axis=0))
+                self.assertTrue(np.all(steps.max(axis=1) == 1))
+    
+    def test_trace_boundary_empty(self):
+        """Test tracing an empty mask returns no points"""
+        traced = trace_boundary(np.zeros((5, 5), dtype=np.bool_))
+        self.assertEqual(traced.shape, (0, 2))
+
+
+class TestJobStore(unittest.TestCase):
+    """Test suite for the in-memory job store"""
+    
+    def setUp(self):
+        self.store = InMemoryJobStore()
+    
+    def _create(self, job_id, batch_id=None, now=0.0):
+        with mock.patch('time.monotonic', return_value=now):
+            asyncio.run(self.store.create(
+                VectorizationStatus(job_id=job_id, status='queued', progress=0),
+                batch_id=batch_id
+            ))
+    
+    def test_ttl_eviction(self):
+        """Test expired jobs are dropped (with their batch) when a new job arrives"""
+        self._create('old-1', batch_id='old-batch', now=0.0)
+        self._create('old-2', batch_id='old-batch', now=1.0)
+        self._create('live', now=JOB_TTL_SECONDS / 2)
+        self._create('new', now=JOB_TTL_SECONDS + 0.5)
+        
+        self.assertIsNone(asyncio.run(self.store.get('old-1')))
+        self.assertIsNotNone(asyncio.run(self.store.get('old-2')))
+        self.assertEqual([j.job_id for j in asyncio.run(self.store.get_batch('old-batch'))], ['old-2'])
+        
+        self._create('newer', now=JOB_TTL_SECONDS + 2.0)
+        self.assertIsNone(asyncio.run(self.store.get('old-2')))
+        self.assertEqual(asyncio.run(self.store.get_batch('old-batch')), [])
+        self.assertEqual(list(self.store.jobs), ['live', 'new', 'newer'])
+    
+    def test_batch_order(self):
+        """Test batch jobs come back in upload order"""
+        job_ids = ['job-c', 'job-a', 'job-e', 'job-b', 'job-d']
+        for job_id in job_ids:
+            self._create(job_id, batch_id='batch')
+        
+        batch = asyncio.run(self.store.get_batch('batch'))
+        self.assertEqual([j.job_id for j in batch], job_ids)
+        self.assertTrue(all(j.batch_id == 'batch' for j in batch))
+    
+    def test_result_cache(self):
+        """Test cached outputs are returned until they expire"""
+        with mock.patch('time.monotonic', return_value=0.0):
+            asyncio.run(self.store.set_result('abc:high', 'a.svg'))
+            asyncio.run(self.store.set_result('def:high', 'd.svg'))
+            self.assertEqual(asyncio.run(self.store.get_result('abc:high')), 'a.svg')
+            self.assertIsNone(asyncio.run(self.store.get_result('abc:fast')))
+        
+        with mock.patch('time.monotonic', return_value=RESULT_TTL_SECONDS / 2):
+            asyncio.run(self.store.set_result('abc:high', 'a2.svg'))  # Refreshed
+        
+        with mock.patch('time.monotonic', return_value=RESULT_TTL_SECONDS + 1.0):
+            self.assertIsNone(asyncio.run(self.store.get_result('def:high')))
+            self.assertEqual(asyncio.run(self.store.get_result('abc:high')), 'a2.svg')
+            asyncio.run(self.store.set_result('ghi:high', 'g.svg'))
+        
+        self.assertEqual(list(self.store.results), ['abc:high', 'ghi:high'])
+
 
 @unittest.skipUnless(RUST_AVAILABLE, "Rust core not available")
 class TestRustCore(unittest.TestCase):
@@ -123,7 +388,33 @@ class TestRustCore(unittest.TestCase):
         # Should be valid PNG
         result_img = Image.open(io.BytesIO(bytes(result_bytes)))
         self.assertEqual(result_img.size, (50, 50))
-    
+
+    def test_raw_buffer_matches_png_path(self):
+        """Raw-buffer entry points return the same pixels as the PNG ones"""
+        img = Image.new('RGB', (50, 50), color='white')
+        for y in range(25):
+            for x in range(25):
+                img.putpixel((x, y), (255, 0, 0))
+
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        img_bytes = list(buf.getvalue())
+
+        quantized = rust_core.quantize_colors_raw(img.tobytes(), 50, 50, 8, 10)
+        expected = Image.open(io.BytesIO(bytes(rust_core.quantize_colors(img_bytes, 8, 10))))
+        self.assertEqual(quantized, expected.convert('RGB').tobytes())
+
+        quantized = rust_core.quantize_colors_lab_raw(img.tobytes(), 50, 50, 8, 10)
+        expected = Image.open(io.BytesIO(bytes(rust_core.quantize_colors_lab(img_bytes, 8, 10))))
+        self.assertEqual(quantized, expected.convert('RGB').tobytes())
+
+        edges = rust_core.detect_edges_sobel_raw(img.tobytes(), 50, 50, 30)
+        expected = Image.open(io.BytesIO(bytes(rust_core.detect_edges_sobel(img_bytes, 30))))
+        self.assertEqual(edges, expected.convert('L').tobytes())
+
+        with self.assertRaises(ValueError):
+            rust_core.quantize_colors_raw(img.tobytes(), 49, 50, 8, 10)
+
     def test_quantize_colors_lab(self):
         """Test LAB color quantization"""
         img = Image.new('RGB', (50, 50), color='white')
@@ -219,13 +510,246 @@ class TestSemanticVectorizer(unittest.TestCase):
     def test_semantic_vectorization(self):
         """Test semantic layer generation"""
         output_path = os.path.join(self.test_dir, 'output_semantic.svg')
-        svg_content = vectorize_semantic(self.test_image_path, output_path, 3)
+        svg_path = vectorize_semantic(self.test_image_path, output_path, 3)
         
+        self.assertEqual(svg_path, output_path)
         self.assertTrue(os.path.exists(output_path))
+        with open(output_path) as f:
+            svg_content = f.read()
         self.assertIn('<?xml', svg_content)
         self.assertIn('<svg', svg_content)
 
 
+class TestWorkerPool(unittest.TestCase):
+    """Test suite for the API worker process pool"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Create test image"""
+        cls.test_dir = tempfile.mkdtemp()
+        
+        img = Image.new('RGB', (60, 60), color='white')
+        for y in range(20, 40):
+            for x in range(20, 40):
+                img.putpixel((x, y), (0, 0, 255))
+        
+        cls.test_image_path = os.path.join(cls.test_dir, 'test_pool.png')
+        img.save(cls.test_image_path)
+    
+    def test_recovers_from_killed_worker(self):
+        """Test a job still runs after a pool worker was killed"""
+        app = api_server.app
+        output_path = os.path.join(self.test_dir, 'output_pool.svg')
+        
+        async def kill_worker_then_vectorize():
+            async with api_server.lifespan(app):
+                pid = await api_server.run_in_pool(os.getpid)
+                os.kill(pid, signal.SIGKILL)
+                broken_pool = app.state.vectorize_pool
+                
+                await api_server.run_in_pool(
+                    api_server.run_vectorizer, self.test_image_path, output_path, 'fast'
+                )
+                return broken_pool, app.state.vectorize_pool
+        
+        broken_pool, current_pool = asyncio.run(kill_worker_then_vectorize())
+        
+        self.assertIsNot(current_pool, broken_pool)
+        self.assertTrue(os.path.exists(output_path))
+        self.assertTrue(os.path.exists(output_path + '.gz'))
+    
+    def test_import_starts_no_pool(self):
+        """Test the pool and log listener are started by the app lifespan, not at import"""
+        self.assertFalse(hasattr(api_server, 'vectorize_pool'))
+        self.assertIsNone(api_server.log_listener._thread)
+
+
+class TestApiServer(unittest.TestCase):
+    """Test suite for API upload and download helpers"""
+    
+    @staticmethod
+    def _encoded(fmt, size=(40, 30)):
+        """A solid image encoded as PNG or JPEG bytes"""
+        buf = io.BytesIO()
+        Image.new('RGB', size, color='red').save(buf, format=fmt)
+        return buf.getvalue()
+    
+    @staticmethod
+    def _upload(data, filename='upload.png', max_size=1024 * 1024):
+        """UploadFile spooled like Starlette's (in memory up to max_size)"""
+        spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+        spooled.write(data)
+        spooled.seek(0)
+        return UploadFile(spooled, size=len(data), filename=filename)
+    
+    def test_image_dimensions(self):
+        """Test width/height are read from PNG and JPEG headers"""
+        self.assertEqual(api_server._image_dimensions(self._encoded('PNG')), (40, 30))
+        self.assertEqual(api_server._image_dimensions(self._encoded('JPEG')), (40, 30))
+        
+        # JPEG with an APP1 (EXIF-style) segment ahead of the frame header
+        jpeg = self._encoded('JPEG')
+        app1 = b'\xff\xe1' + struct.pack('>H', 2 + 5000) + bytes(5000)
+        self.assertEqual(api_server._image_dimensions(jpeg[:2] + app1 + jpeg[2:]), (40, 30))
+        
+        # Truncated before the size fields: unknown rather than wrong
+        self.assertIsNone(api_server._image_dimensions(self._encoded('PNG')[:20]))
+        self.assertIsNone(api_server._image_dimensions(jpeg[:2] + app1[:100]))
+        self.assertIsNone(api_server._image_dimensions(b'\xff\xd8\xff'))
+    
+    def test_validate_image(self):
+        """Test uploads are checked by extension, magic bytes and declared size"""
+        png = self._encoded('PNG')
+        self.assertEqual(asyncio.run(api_server.validate_image(self._upload(png, 'a.PNG'))), '.png')
+        
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(api_server.validate_image(self._upload(png, 'a.gif')))
+        self.assertEqual(ctx.exception.status_code, 400)
+        
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(api_server.validate_image(self._upload(b'MZ' + bytes(100), 'a.png')))
+        self.assertEqual(ctx.exception.status_code, 400)
+        
+        # Decompression bomb: a tiny file whose IHDR declares 100000x100000
+        ihdr = struct.pack('>IIBBBBB', 100000, 100000, 8, 2, 0, 0, 0)
+        bomb = (b'\x89PNG\r\n\x1a\n' + struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr
+                + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr)))
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(api_server.validate_image(self._upload(bomb, 'bomb.png')))
+        self.assertEqual(ctx.exception.status_code, 413)
+    
+    def test_stage_upload(self):
+        """Test small uploads stay in memory and larger ones are written to disk"""
+        data = self._encoded('PNG', size=(200, 200))
+        digest = hashlib.sha256(data).hexdigest()
+        dst = Path(tempfile.mkdtemp()) / 'staged.png'
+        
+        image, staged_digest = asyncio.run(api_server.stage_upload(self._upload(data), dst))
+        self.assertEqual(image, data)
+        self.assertEqual(staged_digest, digest)
+        self.assertFalse(dst.exists())
+        
+        with mock.patch.object(api_server, 'UPLOAD_SPOOL_SIZE', 64):
+            upload = self._upload(data, max_size=64)
+            image, staged_digest = asyncio.run(api_server.stage_upload(upload, dst))
+        self.assertEqual(image, str(dst))
+        self.assertEqual(staged_digest, digest)
+        self.assertEqual(dst.read_bytes(), data)
+    
+    def test_stage_upload_unknown_size(self):
+        """Test an upload without a recorded size is streamed to disk"""
+        data = self._encoded('PNG')
+        dst = Path(tempfile.mkdtemp()) / 'unknown_size.png'
+        upload = self._upload(data)
+        upload.size = None
+        
+        image, staged_digest = asyncio.run(api_server.stage_upload(upload, dst))
+        self.assertEqual(image, str(dst))
+        self.assertEqual(staged_digest, hashlib.sha256(data).hexdigest())
+        self.assertEqual(dst.read_bytes(), data)
+    
+    def test_stage_upload_too_large(self):
+        """Test an oversized spooled upload is rejected and its partial file removed"""
+        dst = Path(tempfile.mkdtemp()) / 'too_large.png'
+        upload = self._upload(self._encoded('PNG', size=(200, 200)), max_size=64)
+        upload.size = None  # Not known up front: caught mid-stream
+        with mock.patch.object(api_server, 'MAX_FILE_SIZE', 100):
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(api_server.stage_upload(upload, dst))
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertFalse(dst.exists())
+    
+    def test_batch_upload_failure_cleans_up(self):
+        """Test a batch with one oversized file leaves no staged files behind"""
+        uploads = [
+            self._upload(self._encoded('PNG'), 'small.png', max_size=64),
+            self._upload(self._encoded('PNG', size=(200, 200)), 'large.png', max_size=64),
+        ]
+        for upload in uploads:
+            upload.size = None  # Streamed to disk, size checked mid-stream
+        upload_dir = Path(tempfile.mkdtemp())
+        store = InMemoryJobStore()
+        
+        with mock.patch.object(api_server, 'UPLOAD_DIR', upload_dir), \
+                mock.patch.object(api_server, 'MAX_FILE_SIZE', len(self._encoded('PNG')) + 1), \
+                mock.patch.object(api_server, 'job_store', store):
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(api_server.batch_upload(uploads, 'fast'))
+        self.assertEqual(ctx.exception.status_code, 413)
+        self.assertEqual(list(upload_dir.iterdir()), [])
+        self.assertEqual(store.jobs, {})
+    
+    def test_result_cache_hit(self):
+        """Test an identical upload reuses the earlier output via a hardlink"""
+        data = self._encoded('PNG', size=(60, 60))
+        store = InMemoryJobStore()
+        pool_calls = []
+        
+        async def run_in_process(fn, *args):
+            pool_calls.append(args)
+            return fn(*args)
+        
+        async def vectorize_twice():
+            for job_id in ('first', 'second'):
+                await store.create(VectorizationStatus(job_id=job_id, status='queued', progress=0))
+                await api_server.process_vectorization(job_id, data, 'fast', 'digest')
+            return await store.get('first'), await store.get('second')
+        
+        with mock.patch.object(api_server, 'job_store', store), \
+                mock.patch.object(api_server, 'OUTPUT_DIR', Path(tempfile.mkdtemp())), \
+                mock.patch.object(api_server, 'run_in_pool', run_in_process):
+            first, second = asyncio.run(vectorize_twice())
+        
+        self.assertEqual((first.status, second.status), ('completed', 'completed'))
+        self.assertEqual(len(pool_calls), 1)
+        self.assertNotEqual(first.output_file, second.output_file)
+        self.assertTrue(os.path.samefile(first.output_file, second.output_file))
+        self.assertTrue(os.path.samefile(first.output_file + '.gz', second.output_file + '.gz'))
+    
+    def test_download_deleted_output(self):
+        """Test a download reflects the output file on disk, not a stale stat"""
+        output_path = os.path.join(tempfile.mkdtemp(), 'output.svg')
+        with open(output_path, 'w') as f:
+            f.write('<svg/>')
+        asyncio.run(api_server.job_store.create(VectorizationStatus(
+            job_id='download-test', status='completed', progress=100,
+            output_file=output_path
+        )))
+        client = TestClient(api_server.app)
+        
+        response = client.get('/api/download/download-test')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, '<svg/>')
+        
+        # Rewritten: new size served
+        with open(output_path, 'w') as f:
+            f.write('<svg></svg>')
+        response = client.get('/api/download/download-test')
+        self.assertEqual(response.text, '<svg></svg>')
+        
+        # Deleted: 404 rather than a broken response
+        os.remove(output_path)
+        response = client.get('/api/download/download-test')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_accepts_gzip(self):
+        """Test Accept-Encoding parsing honours q-values and the wildcard"""
+        for header, expected in (
+            ('gzip, deflate, br', True),
+            ('br;q=1.0, GZIP;q=0.5', True),
+            ('x-gzip', True),
+            ('gzip;q=0', False),
+            ('gzip; q=0.000, *', False),
+            ('identity', False),
+            ('*;q=0.1', True),
+            ('*;q=0', False),
+            ('gzip;q=bogus', False),
+            ('', False),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(api_server._accepts_gzip(header), expected)
+
+
 class TestPerformance(unittest.TestCase):
     """Performance benchmarks"""
     
@@ -264,6 +788,8 @@ def run_tests():
     
     # Add test classes
     suite.addTests(loader.loadTestsFromTestCase(TestIntelligentVectorizer))
+    suite.addTests(loader.loadTestsFromTestCase(TestJitKernels))
+    suite.addTests(loader.loadTestsFromTestCase(TestJobStore))
     if RUST_AVAILABLE:
         suite.addTests(loader.loadTestsFromTestCase(TestRustCore))
         print("[INFO] Rust core tests enabled")
@@ -271,6 +797,8 @@ def run_tests():
         print("[WARNING] Rust core not available - skipping Rust tests")
     
     suite.addTests(loader.loadTestsFromTestCase(TestSemanticVectorizer))
+    suite.addTests(loader.loadTestsFromTestCase(TestWorkerPool))
+    suite.addTests(loader.loadTestsFromTestCase(TestApiServer))
     suite.addTests(loader.loadTestsFromTestCase(TestPerformance))
     
     runner = unittest.TextTestRunner(verbosity=2)
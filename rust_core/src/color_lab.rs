@@ -60,6 +60,12 @@ pub fn color_distance_lab(l1: f32, a1: f32, b1: f32, l2: f32, a2: f32, b2: f32)
 
 /// K-means clustering in LAB space for perceptually uniform color quantization
 /// This produces much better results than RGB-based k-means
+///
+/// Uses Hamerly's bounds: each pixel keeps an upper bound on the distance to
+/// its centroid and a lower bound on the distance to any other one. When the
+/// triangle inequality shows the assignment cannot change, the pixel is
+/// skipped instead of being compared against all k centroids. Assignments
+/// match plain Lloyd iterations (up to exact distance ties).
 pub fn kmeans_lab(pixels_rgb: &[(u8, u8, u8)], k: usize, max_iter: usize) -> Vec<(u8, u8, u8)> {
     if pixels_rgb.is_empty() || k == 0 {
         return Vec::new();
@@ -84,23 +90,62 @@ pub fn kmeans_lab(pixels_rgb: &[(u8, u8, u8)], k: usize, max_iter: usize) -> Vec
     }
     
     let mut assignments = vec![0usize; pixels_lab.len()];
+    let mut upper = vec![0.0f32; pixels_lab.len()];
+    let mut lower = vec![0.0f32; pixels_lab.len()];
     
     // K-means iterations
-    for _ in 0..max_iter {
+    for iter in 0..max_iter {
+        // Half the distance from each centroid to its nearest neighbour: a
+        // pixel closer than that to its own centroid cannot be closer to another
+        let half_gap: Vec<f32> = (0..k)
+            .map(|ci| {
+                let (cl, ca, cb) = centroids[ci];
+                (0..k)
+                    .filter(|&cj| cj != ci)
+                    .map(|cj| {
+                        let (ol, oa, ob) = centroids[cj];
+                        color_distance_lab(cl, ca, cb, ol, oa, ob)
+                    })
+                    .fold(f32::MAX, f32::min) * 0.5
+            })
+            .collect();
+        
         // Assignment step
         for (i, &(l, a, b)) in pixels_lab.iter().enumerate() {
+            if iter > 0 {
+                let bound = half_gap[assignments[i]].max(lower[i]);
+                if upper[i] <= bound {
+                    continue;
+                }
+                
+                // Tighten the upper bound before paying for a full scan
+                let (cl, ca, cb) = centroids[assignments[i]];
+                upper[i] = color_distance_lab(l, a, b, cl, ca, cb);
+                if upper[i] <= bound {
+                    continue;
+                }
+            }
+            
+            // Full scan on squared distances; only the two nearest need a sqrt
             let mut min_dist = f32::MAX;
+            let mut second_dist = f32::MAX;
             let mut best_cluster = 0;
             
             for (ci, &(cl, ca, cb)) in centroids.iter().enumerate() {
-                let dist = color_distance_lab(l, a, b, cl, ca, cb);
+                let (dl, da, db) = (l - cl, a - ca, b - cb);
+                let dist = dl * dl + da * da + db * db;
                 if dist < min_dist {
+                    second_dist = min_dist;
                     min_dist = dist;
                     best_cluster = ci;
+                } else if dist < second_dist {
+                    second_dist = dist;
                 }
             }
             
             assignments[i] = best_cluster;
+            upper[i] = min_dist.sqrt();
+            lower[i] = second_dist.sqrt();
         }
         
         // Update step
@@ -115,16 +160,39 @@ pub fn kmeans_lab(pixels_rgb: &[(u8, u8, u8)], k: usize, max_iter: usize) -> Vec
             counts[cluster] += 1;
         }
         
+        let mut moved = vec![0.0f32; k];
         for i in 0..k {
             if counts[i] > 0 {
                 let count = counts[i] as f32;
-                centroids[i] = (
+                let updated = (
                     sums[i].0 / count,
                     sums[i].1 / count,
                     sums[i].2 / count
                 );
+                let (ol, oa, ob) = centroids[i];
+                moved[i] = color_distance_lab(ol, oa, ob, updated.0, updated.1, updated.2);
+                centroids[i] = updated;
             }
         }
+        
+        // Loosen the bounds by how far the centroids moved; the lower bound
+        // drops by the largest move among the other centroids
+        let mut farthest = 0;
+        for ci in 1..k {
+            if moved[ci] > moved[farthest] {
+                farthest = ci;
+            }
+        }
+        let runner_up = (0..k)
+            .filter(|&ci| ci != farthest)
+            .map(|ci| moved[ci])
+            .fold(0.0f32, f32::max);
+        
+        for i in 0..pixels_lab.len() {
+            let cluster = assignments[i];
+            upper[i] += moved[cluster];
+            lower[i] -= if cluster == farthest { runner_up } else { moved[farthest] };
+        }
     }
     
     // Convert centroids back to RGB
@@ -133,6 +201,44 @@ pub fn kmeans_lab(pixels_rgb: &[(u8, u8, u8)], k: usize, max_iter: usize) -> Vec
         .collect()
 }
 
+/// LAB k-means quantization of raw row-major RGB bytes.
+/// Returns the quantized pixels in the same RGB layout.
+pub fn quantize_rgb(rgb: &[u8], k: usize, max_iter: usize) -> Vec<u8> {
+    let pixels: Vec<(u8, u8, u8)> = rgb.chunks_exact(3)
+        .map(|p| (p[0], p[1], p[2]))
+        .collect();
+    
+    let centroids = kmeans_lab(&pixels, k, max_iter);
+    if centroids.is_empty() {
+        return rgb.to_vec();
+    }
+    
+    // Centroids only change once, so convert them to LAB up front
+    let centroids_lab: Vec<(f32, f32, f32)> = centroids.iter()
+        .map(|&(r, g, b)| rgb_to_lab(r, g, b))
+        .collect();
+    
+    // Map each pixel to nearest centroid in LAB space
+    let mut quantized = Vec::with_capacity(rgb.len());
+    for &(r, g, b) in &pixels {
+        let (pl, pa, pb) = rgb_to_lab(r, g, b);
+        let mut min_dist = f32::MAX;
+        let mut best_color = centroids[0];
+        
+        for (&color, &(cl, ca, cb)) in centroids.iter().zip(&centroids_lab) {
+            let dist = color_distance_lab(pl, pa, pb, cl, ca, cb);
+            if dist < min_dist {
+                min_dist = dist;
+                best_color = color;
+            }
+        }
+        
+        quantized.extend_from_slice(&[best_color.0, best_color.1, best_color.2]);
+    }
+    
+    quantized
+}
+
 // Helper functions
 
 fn gamma_to_linear(c: f32) -> f32 {
@@ -233,6 +339,54 @@ mod tests {
         }
     }
 
+    #[test]
+    fn test_kmeans_matches_lloyd() {
+        // Deterministic pseudo-random pixels (LCG), a few loose color clusters
+        let mut state = 12345u32;
+        let mut next = || {
+            state = state.wrapping_mul(1_103_515_245).wrapping_add(12_345);
+            (state >> 16) as u8
+        };
+        let pixels: Vec<(u8, u8, u8)> = (0..4000)
+            .map(|i| {
+                let base = [(200u8, 40u8, 40u8), (40, 180, 60), (30, 60, 200), (220, 220, 210)][i % 4];
+                (base.0.saturating_add(next() / 4), base.1.saturating_add(next() / 4),
+                 base.2.saturating_sub(next() / 4))
+            })
+            .collect();
+        
+        // Plain Lloyd iterations from the same initial centroids
+        let lab: Vec<(f32, f32, f32)> = pixels.iter().map(|&(r, g, b)| rgb_to_lab(r, g, b)).collect();
+        let k = 8;
+        let mut centroids: Vec<(f32, f32, f32)> = lab.iter().step_by(lab.len() / k).take(k).cloned().collect();
+        for _ in 0..15 {
+            let mut sums = vec![(0.0f32, 0.0f32, 0.0f32); k];
+            let mut counts = vec![0u32; k];
+            for &(l, a, b) in &lab {
+                let mut best = (f32::MAX, 0);
+                for (ci, &(cl, ca, cb)) in centroids.iter().enumerate() {
+                    let dist = color_distance_lab(l, a, b, cl, ca, cb);
+                    if dist < best.0 {
+                        best = (dist, ci);
+                    }
+                }
+                sums[best.1].0 += l;
+                sums[best.1].1 += a;
+                sums[best.1].2 += b;
+                counts[best.1] += 1;
+            }
+            for ci in 0..k {
+                if counts[ci] > 0 {
+                    let count = counts[ci] as f32;
+                    centroids[ci] = (sums[ci].0 / count, sums[ci].1 / count, sums[ci].2 / count);
+                }
+            }
+        }
+        let expected: Vec<(u8, u8, u8)> = centroids.iter().map(|&(l, a, b)| lab_to_rgb(l, a, b)).collect();
+        
+        assert_eq!(kmeans_lab(&pixels, k, 15), expected);
+    }
+
     #[test]
     fn test_color_distance() {
         // Distance from white to black should be large
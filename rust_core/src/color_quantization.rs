@@ -16,6 +16,53 @@ pub fn quantize(image_bytes: &[u8], k: usize, max_iter: usize) -> PyResult<Vec<u
         .map(|i| [raw_pixels[i] as f32, raw_pixels[i+1] as f32, raw_pixels[i+2] as f32])
         .collect();
 
+    let (centroids, assignments) = kmeans(&pixels, k, max_iter)?;
+
+    let mut output = Vec::with_capacity((w * h * 4) as usize);
+    for idx in assignments {
+        let c = centroids[idx];
+        output.push(c[0].round() as u8);
+        output.push(c[1].round() as u8);
+        output.push(c[2].round() as u8);
+        output.push(255);
+    }
+
+    let img_buf = image::ImageBuffer::<image::Rgba<u8>, _>::from_raw(w, h, output)
+        .ok_or_else(|| PyValueError::new_err("Failed to create image buffer"))?;
+    
+    let mut png_data = Vec::new();
+    image::DynamicImage::ImageRgba8(img_buf)
+        .write_to(&mut std::io::Cursor::new(&mut png_data), image::ImageFormat::Png)
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+    
+    Ok(png_data)
+}
+
+/// Same k-means as `quantize`, on raw row-major RGB bytes (no PNG codec).
+/// Returns the quantized pixels in the same RGB layout.
+pub fn quantize_raw(rgb: &[u8], width: u32, height: u32, k: usize, max_iter: usize) -> PyResult<Vec<u8>> {
+    if rgb.len() != width as usize * height as usize * 3 {
+        return Err(PyValueError::new_err("Buffer size does not match width * height * 3"));
+    }
+
+    let pixels: Vec<[f32; 3]> = rgb.chunks_exact(3)
+        .map(|p| [p[0] as f32, p[1] as f32, p[2] as f32])
+        .collect();
+
+    let (centroids, assignments) = kmeans(&pixels, k, max_iter)?;
+
+    let mut output = Vec::with_capacity(rgb.len());
+    for idx in assignments {
+        let c = centroids[idx];
+        output.push(c[0].round() as u8);
+        output.push(c[1].round() as u8);
+        output.push(c[2].round() as u8);
+    }
+
+    Ok(output)
+}
+
+fn kmeans(pixels: &[[f32; 3]], k: usize, max_iter: usize) -> PyResult<(Vec<[f32; 3]>, Vec<usize>)> {
     if k == 0 || pixels.is_empty() {
         return Err(PyValueError::new_err("Invalid k or empty image"));
     }
@@ -47,7 +94,7 @@ pub fn quantize(image_bytes: &[u8], k: usize, max_iter: usize) -> PyResult<Vec<u
         let mut sums = vec![[0f32; 3]; k];
         let mut counts = vec![0u32; k];
         
-        for (idx, pixel) in assignments.iter().zip(&pixels) {
+        for (idx, pixel) in assignments.iter().zip(pixels) {
             sums[*idx][0] += pixel[0];
             sums[*idx][1] += pixel[1];
             sums[*idx][2] += pixel[2];
@@ -62,22 +109,5 @@ pub fn quantize(image_bytes: &[u8], k: usize, max_iter: usize) -> PyResult<Vec<u
         }
     }
 
-    let mut output = Vec::with_capacity((w * h * 4) as usize);
-    for idx in assignments {
-        let c = centroids[idx];
-        output.push(c[0].round() as u8);
-        output.push(c[1].round() as u8);
-        output.push(c[2].round() as u8);
-        output.push(255);
-    }
-
-    let img_buf = image::ImageBuffer::<image::Rgba<u8>, _>::from_raw(w, h, output)
-        .ok_or_else(|| PyValueError::new_err("Failed to create image buffer"))?;
-    
-    let mut png_data = Vec::new();
-    image::DynamicImage::ImageRgba8(img_buf)
-        .write_to(&mut std::io::Cursor::new(&mut png_data), image::ImageFormat::Png)
-        .map_err(|e| PyValueError::new_err(e.to_string()))?;
-    
-    Ok(png_data)
+    Ok((centroids, assignments))
 }
@@ -9,22 +9,48 @@ pub fn sobel_edge_detection(image_bytes: &[u8], threshold: u8) -> PyResult<Vec<u
     
     let gray = img.to_luma8();
     let (w, h) = img.dimensions();
+    let edges = sobel(gray.as_raw(), w as usize, h as usize, threshold);
     
+    let edge_img = image::ImageBuffer::from_raw(w, h, edges)
+        .ok_or_else(|| PyValueError::new_err("Failed to create edge image"))?;
+    
+    let mut png_data = Vec::new();
+    image::DynamicImage::ImageLuma8(edge_img)
+        .write_to(&mut std::io::Cursor::new(&mut png_data), image::ImageFormat::Png)
+        .map_err(|e| PyValueError::new_err(e.to_string()))?;
+    
+    Ok(png_data)
+}
+
+/// Same Sobel as `sobel_edge_detection`, on raw row-major RGB bytes (no PNG codec).
+/// Returns one byte per pixel (0 or 255).
+pub fn sobel_edge_detection_raw(rgb: &[u8], width: u32, height: u32, threshold: u8) -> PyResult<Vec<u8>> {
+    let img = image::ImageBuffer::<image::Rgb<u8>, &[u8]>::from_raw(width, height, rgb)
+        .ok_or_else(|| PyValueError::new_err("Buffer size does not match width * height * 3"))?;
+    
+    let gray = image::imageops::grayscale(&img);
+    Ok(sobel(gray.as_raw(), width as usize, height as usize, threshold))
+}
+
+fn sobel(gray: &[u8], w: usize, h: usize, threshold: u8) -> Vec<u8> {
     let sobel_x = [[-1i32, 0, 1], [-2, 0, 2], [-1, 0, 1]];
     let sobel_y = [[-1i32, -2, -1], [0, 0, 0], [1, 2, 1]];
     
-    let mut edges = vec![0u8; (w * h) as usize];
+    let mut edges = vec![0u8; w * h];
+    if w < 3 || h < 3 {
+        return edges;
+    }
     
-    edges.par_chunks_mut(w as usize).enumerate().for_each(|(y, row)| {
-        if y == 0 || y >= (h as usize - 1) { return; }
+    edges.par_chunks_mut(w).enumerate().for_each(|(y, row)| {
+        if y == 0 || y >= h - 1 { return; }
         
-        for x in 1..(w as usize - 1) {
+        for x in 1..(w - 1) {
             let mut gx = 0i32;
             let mut gy = 0i32;
             
             for ky in 0..3 {
                 for kx in 0..3 {
-                    let px = gray.get_pixel((x + kx - 1) as u32, (y + ky - 1) as u32)[0] as i32;
+                    let px = gray[(y + ky - 1) * w + (x + kx - 1)] as i32;
                     gx += px * sobel_x[ky][kx];
                     gy += px * sobel_y[ky][kx];
                 }
@@ -35,15 +61,7 @@ pub fn sobel_edge_detection(image_bytes: &[u8], threshold: u8) -> PyResult<Vec<u
         }
     });
     
-    let edge_img = image::ImageBuffer::from_raw(w, h, edges)
-        .ok_or_else(|| PyValueError::new_err("Failed to create edge image"))?;
-    
-    let mut png_data = Vec::new();
-    image::DynamicImage::ImageLuma8(edge_img)
-        .write_to(&mut std::io::Cursor::new(&mut png_data), image::ImageFormat::Png)
-        .map_err(|e| PyValueError::new_err(e.to_string()))?;
-    
-    Ok(png_data)
+    edges
 }
 
 pub fn canny_edge_detection(_image_bytes: &[u8], _low: u8, _high: u8) -> PyResult<Vec<u8>> {
@@ -1,4 +1,5 @@
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use image::GenericImageView;
 
 mod color_quantization;
@@ -13,9 +14,12 @@ mod simd_ops;
 fn rust_core(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(quantize_colors, m)?)?;
     m.add_function(wrap_pyfunction!(detect_edges_sobel, m)?)?;
+    m.add_function(wrap_pyfunction!(quantize_colors_raw, m)?)?;
+    m.add_function(wrap_pyfunction!(detect_edges_sobel_raw, m)?)?;
     m.add_function(wrap_pyfunction!(detect_edges_canny, m)?)?;
     m.add_function(wrap_pyfunction!(detect_edges_ai, m)?)?;
     m.add_function(wrap_pyfunction!(quantize_colors_lab, m)?)?;
+    m.add_function(wrap_pyfunction!(quantize_colors_lab_raw, m)?)?;
     m.add_function(wrap_pyfunction!(init_onnx, m)?)?;
     m.add_function(wrap_pyfunction!(check_model_exists, m)?)?;
     m.add_function(wrap_pyfunction!(get_model_info, m)?)?;
@@ -55,6 +59,37 @@ fn detect_edges_sobel<'py>(py: Python<'py>, image_bytes: Vec<u8>, threshold: u8)
     py.allow_threads(|| edge_detection::sobel_edge_detection(&image_bytes, threshold))
 }
 
+/// Raw-buffer variants: row-major RGB `bytes` in, `bytes` out (RGB for
+/// quantization, one byte per pixel for edges) - skips the PNG round-trip.
+#[pyfunction]
+fn quantize_colors_raw<'py>(
+    py: Python<'py>,
+    pixels: &[u8],
+    width: u32,
+    height: u32,
+    k: usize,
+    max_iter: usize
+) -> PyResult<&'py PyBytes> {
+    let quantized = py.allow_threads(|| {
+        color_quantization::quantize_raw(pixels, width, height, k, max_iter)
+    })?;
+    Ok(PyBytes::new(py, &quantized))
+}
+
+#[pyfunction]
+fn detect_edges_sobel_raw<'py>(
+    py: Python<'py>,
+    pixels: &[u8],
+    width: u32,
+    height: u32,
+    threshold: u8
+) -> PyResult<&'py PyBytes> {
+    let edges = py.allow_threads(|| {
+        edge_detection::sobel_edge_detection_raw(pixels, width, height, threshold)
+    })?;
+    Ok(PyBytes::new(py, &edges))
+}
+
 #[pyfunction]
 fn detect_edges_canny<'py>(py: Python<'py>, image_bytes: Vec<u8>, low: u8, high: u8) -> PyResult<Vec<u8>> {
     py.allow_threads(|| edge_detection::canny_edge_detection(&image_bytes, low, high))
@@ -107,36 +142,8 @@ fn quantize_colors_lab<'py>(
         let rgb = img.to_rgb8();
         let (w, h) = img.dimensions();
         
-        // Extract RGB pixels
-        let pixels: Vec<(u8, u8, u8)> = rgb.pixels()
-            .map(|p| (p[0], p[1], p[2]))
-            .collect();
-        
-        // Perform LAB k-means
-        let centroids = color_lab::kmeans_lab(&pixels, k, max_iter);
-        
-        // Map each pixel to nearest centroid
-        let quantized: Vec<u8> = rgb.pixels()
-            .flat_map(|p| {
-                let (r, g, b) = (p[0], p[1], p[2]);
-                let (pl, pa, pb) = color_lab::rgb_to_lab(r, g, b);
-                
-                // Find nearest centroid in LAB space
-                let mut min_dist = f32::MAX;
-                let mut best_color = centroids[0];
-                
-                for &(cr, cg, cb) in &centroids {
-                    let (cl, ca, cb_lab) = color_lab::rgb_to_lab(cr, cg, cb);
-                    let dist = color_lab::color_distance_lab(pl, pa, pb, cl, ca, cb_lab);
-                    if dist < min_dist {
-                        min_dist = dist;
-                        best_color = (cr, cg, cb);
-                    }
-                }
-                
-                vec![best_color.0, best_color.1, best_color.2]
-            })
-            .collect();
+        // Perform LAB k-means and map each pixel to its nearest centroid
+        let quantized = color_lab::quantize_rgb(rgb.as_raw(), k, max_iter);
         
         // Create output image
         let img_buf = image::ImageBuffer::<image::Rgb<u8>, _>::from_raw(w, h, quantized)
@@ -150,3 +157,21 @@ fn quantize_colors_lab<'py>(
         Ok(png_data)
     })
 }
+
+#[pyfunction]
+fn quantize_colors_lab_raw<'py>(
+    py: Python<'py>,
+    pixels: &[u8],
+    width: u32,
+    height: u32,
+    k: usize,
+    max_iter: usize
+) -> PyResult<&'py PyBytes> {
+    if pixels.len() != width as usize * height as usize * 3 {
+        return Err(pyo3::exceptions::PyValueError::new_err(
+            "Buffer size does not match width * height * 3"
+        ));
+    }
+    let quantized = py.allow_threads(|| color_lab::quantize_rgb(pixels, k, max_iter));
+    Ok(PyBytes::new(py, &quantized))
+}